@@ -0,0 +1,32 @@
+"""
+ASGI config for Django Store Assessment project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server, e.g. Gunicorn with Uvicorn workers::
+
+    gunicorn config.asgi --worker-class uvicorn.workers.UvicornWorker
+
+The store list and retrieve endpoints run as coroutines; everything else
+runs in a thread per request, which also means CONN_MAX_AGE no longer
+reuses database connections. Put a pooler such as PgBouncer in front of
+Postgres instead.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/dev/howto/deployment/asgi/
+
+"""
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+# This allows easy placement of apps within the interior
+# django_store_assessment directory.
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / "django_store_assessment"))
+# We defer to a DJANGO_SETTINGS_MODULE already in the environment.
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+# This application object is used by any ASGI server configured to use this file.
+application = get_asgi_application()
@@ -53,6 +53,14 @@ DATABASES = {
     ),
 }
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Read replicas, e.g. postgres://replica-1/db,postgres://replica-2/db, see utils/db.py
+for number, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), start=1):
+    DATABASES[f"replica{number}"] = {**env.db_url_config(url), "TEST": {"MIRROR": "default"}}
+DATABASE_ROUTERS = ["django_store_assessment.utils.db.PrimaryReplicaRouter"]
+# Turns reads from the replicas off without removing them, everything goes to the primary
+DATABASE_REPLICA_READS = env.bool("DATABASE_REPLICA_READS", True)
+# How long a user's reads stay on the primary after a write, should exceed the replication lag
+DATABASE_REPLICA_PIN_SECONDS = env.int("DATABASE_REPLICA_PIN_SECONDS", 10)
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -138,6 +146,8 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    # First, so that its timings cover the rest of the stack; off unless REQUEST_TIMING is set
+    "django_store_assessment.utils.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -151,6 +161,21 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# Server-Timing headers and a log line per request, see utils/timing.py
+REQUEST_TIMING = env.bool("DJANGO_REQUEST_TIMING", False)
+
+
+def budget(var, default):
+    # An empty value turns the budget off
+    value = env.str(var, str(default))
+    return int(value) if value else None
+
+
+# Requests above either budget are logged as warnings: 20 queries and 500 ms
+# unless set, e.g. DJANGO_REQUEST_TIMING_LATENCY_BUDGET_MS= for no latency budget
+REQUEST_TIMING_QUERY_BUDGET = budget("DJANGO_REQUEST_TIMING_QUERY_BUDGET", 20)
+REQUEST_TIMING_LATENCY_BUDGET_MS = budget("DJANGO_REQUEST_TIMING_LATENCY_BUDGET_MS", 500)
+
 # STATIC
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#static-root
@@ -295,9 +320,19 @@ SOCIALACCOUNT_FORMS = {"signup": "django_store_assessment.users.forms.UserSocial
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "django_store_assessment.users.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # orjson backed, with the same output as DRF's JSONRenderer, see utils/fastjson.py
+    "DEFAULT_RENDERER_CLASSES": (
+        "django_store_assessment.utils.fastjson.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "django_store_assessment.utils.fastjson.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -320,3 +355,7 @@ SPECTACULAR_SETTINGS = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Looks up the coordinates of store addresses, a dotted path to a Geocoder
+# subclass, see stores/geocoding.py. Empty leaves addresses without coordinates
+# unless clients send them.
+STORES_GEOCODER = env("STORES_GEOCODER", default="")
@@ -56,3 +56,5 @@ INSTALLED_APPS += ["django_extensions"]  # noqa: F405
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Made up coordinates, no geocoding service needed
+STORES_GEOCODER = "django_store_assessment.stores.geocoding.OfflineGeocoder"
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 
 from django_store_assessment.users.models import User
 from django_store_assessment.users.tests.factories import UserFactory
@@ -9,6 +10,13 @@ def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Database changes are rolled back between tests, cached responses are not
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def user(db) -> User:
     return UserFactory()
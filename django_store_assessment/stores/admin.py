@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 
 from django_store_assessment.stores.models import Address, OpeningHours, Store
 
@@ -12,6 +13,14 @@ class OpeningHoursAdmin(admin.ModelAdmin):
     ordering = ("weekday", "from_hour")
     search_fields = ("weekday",)
 
+    def get_readonly_fields(self, request, obj=None):
+        # Slots are shared and every process caches their pks by content
+        # (managers.slot_cache), which only this process would forget. Add
+        # a new slot and link the stores to it instead of editing one.
+        if obj is not None:
+            return ("weekday", "from_hour", "to_hour")
+        return super().get_readonly_fields(request, obj)
+
 
 @admin.register(Address)
 class AddressAdmin(admin.ModelAdmin):
@@ -21,12 +30,34 @@ class AddressAdmin(admin.ModelAdmin):
     search_fields = ("street", "city", "state", "postal_code", "country")
 
 
+class DaysOpenFilter(admin.SimpleListFilter):
+    title = "days open per week"
+    parameter_name = "days_open"
+
+    def lookups(self, request, model_admin):
+        return [(str(days), str(days)) for days in range(8)]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value is None:
+            return queryset
+        return queryset.filter(days_open_count=int(value))
+
+
 @admin.register(Store)
 class StoreAdmin(admin.ModelAdmin):
     list_display = ("name", "address", "days_open")
-
-    @admin.display(description="Days Open Per Week")
+    list_filter = (DaysOpenFilter,)
+
+    def get_queryset(self, request):
+        # Count the days in the changelist query instead of once per row
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("address")
+            .annotate(days_open_count=Count("opening_hours__weekday", distinct=True))
+        )
+
+    @admin.display(description="Days Open Per Week", ordering="days_open_count")
     def days_open(self, obj):
-        # Calculate the number of unique days the store is open
-        unique_days = obj.opening_hours.values_list("weekday", flat=True).distinct()
-        return len(unique_days)
+        return obj.days_open_count
@@ -0,0 +1,78 @@
+import csv
+import json
+
+ADDRESS_COLUMNS = ["street", "city", "state", "postal_code", "country"]
+# Optional, empty in CSV when unknown
+COORDINATE_COLUMNS = ["latitude", "longitude"]
+CSV_COLUMNS = ["id", "name", "timezone", *ADDRESS_COLUMNS, *COORDINATE_COLUMNS, "opening_hours"]
+
+
+class Echo:
+    """File-like object whose write() hands the line back, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":")) + "\n"
+
+
+def csv_lines(rows):
+    # Address fields become columns, opening hours stay one JSON column
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        address = row["address"] or {}
+        yield writer.writerow(
+            [row["id"], row["name"], row["timezone"]]
+            + [address.get(column, "") for column in ADDRESS_COLUMNS + COORDINATE_COLUMNS]
+            + [json.dumps(row["opening_hours"], separators=(",", ":"))]
+        )
+
+
+def ndjson_rows(lines):
+    """Yield ``(line number, store data)`` pairs, handing malformed lines over as-is to fail validation."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, line
+            continue
+        if isinstance(row, dict) and row.get("address", ...) is None:
+            # Exported stores without an address; the serializer wants the key left out
+            del row["address"]
+        yield line_number, row
+
+
+def csv_rows(lines):
+    """Yield ``(line number, store data)`` pairs from the layout written by ``csv_lines()``."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        address = {column: row.get(column) or "" for column in ADDRESS_COLUMNS}
+        address.update({column: row[column] for column in COORDINATE_COLUMNS if row.get(column)})
+        opening_hours = row.get("opening_hours") or "[]"
+        try:
+            opening_hours = json.loads(opening_hours)
+        except ValueError:
+            pass
+        data = {"name": row.get("name"), "opening_hours": opening_hours}
+        if row.get("timezone"):
+            data["timezone"] = row["timezone"]
+        if any(address.values()):
+            data["address"] = address
+        yield reader.line_num, data
+
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ndjson_lines),
+    "csv": ("text/csv", csv_lines),
+}
+
+IMPORT_FORMATS = {
+    "ndjson": ndjson_rows,
+    "csv": csv_rows,
+}
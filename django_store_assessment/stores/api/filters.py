@@ -0,0 +1,64 @@
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django_filters import rest_framework as filters
+
+from django_store_assessment.stores.geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, parse_near, stores_near
+from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.schedule import open_now_q, parse_open_at
+
+
+def validate_open_at(value):
+    try:
+        parse_open_at(value)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+
+def validate_near(value):
+    try:
+        parse_near(value)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+
+class StoreFilter(filters.FilterSet):
+    open_at = filters.CharFilter(method="filter_open_at", validators=[validate_open_at])
+    # Open at this moment, in the timezone of each store
+    open_now = filters.BooleanFilter(method="filter_open_now")
+    # ?near=<latitude>,<longitude>&radius=<km>, nearest stores first
+    near = filters.CharFilter(method="filter_near", validators=[validate_near])
+    radius = filters.NumberFilter(method="filter_radius", min_value=0, max_value=MAX_RADIUS_KM)
+
+    class Meta:
+        model = Store
+        fields = [
+            "name",
+            "timezone",
+            "address__street",
+            "address__city",
+            "address__state",
+            "address__postal_code",
+            "address__country",
+            "opening_hours__weekday",
+            "opening_hours__from_hour",
+            "opening_hours__to_hour",
+        ]
+
+    def filter_open_at(self, queryset, name, value):
+        # A single GiST-indexed containment check on the denormalized schedule
+        return queryset.filter(open_intervals__contains=parse_open_at(value))
+
+    def filter_open_now(self, queryset, name, value):
+        # One GiST-indexed containment check per timezone the stores are in
+        query = open_now_q(timezone.now(), Store.objects.timezones())
+        return queryset.filter(query) if value else queryset.exclude(query)
+
+    def filter_near(self, queryset, name, value):
+        # An indexed bounding box check, then the exact distance, see geo.py
+        latitude, longitude = parse_near(value)
+        radius = self.form.cleaned_data.get("radius")
+        return stores_near(queryset, latitude, longitude, DEFAULT_RADIUS_KM if radius is None else float(radius))
+
+    def filter_radius(self, queryset, name, value):
+        # Only a parameter of filter_near()
+        return queryset
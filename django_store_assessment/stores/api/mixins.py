@@ -0,0 +1,330 @@
+import hashlib
+from contextlib import ExitStack
+from functools import update_wrapper
+from typing import TYPE_CHECKING, Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.http import Http404
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import ValidationError as APIValidationError
+from rest_framework.response import Response
+
+from django_store_assessment.stores.api.serializers import field_paths, field_tree, select_fields
+from django_store_assessment.stores.cache import (
+    GLOBAL_GENERATION_KEY,
+    aget_generations,
+    get_generations,
+    store_generation_key,
+)
+from django_store_assessment.utils.db import read_from_replicas, reading_from_replica, replica_aliases
+
+if TYPE_CHECKING:
+    from rest_framework.viewsets import ReadOnlyModelViewSet
+
+    class ViewSetBase(ReadOnlyModelViewSet):
+        # What the mixins expect from the viewsets they are combined with
+        async def alist(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+            ...
+
+        async def aretrieve(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+            ...
+
+else:
+    ViewSetBase = object
+
+
+class CachedReadMixin(ViewSetBase):
+    """
+    Cache list and retrieve responses of a store viewset.
+
+    Entries are keyed by host, path, normalized query string, response format
+    and the generations the response depends on, see stores/cache.py. The
+    same key doubles as the ETag, so a client revalidating an unchanged
+    resource gets a 304 without the view touching the database.
+
+    Reads from a replica are cached apart from reads from the primary: a
+    lagging replica can answer with rows older than the current generation,
+    and users pinned to the primary after a write must not be served those.
+    """
+
+    cache_timeout = 300
+    # Query parameters whose answer changes with the clock, e.g. "open now".
+    # Responses to them are cached per minute.
+    time_dependent_params: tuple[str, ...] = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response([GLOBAL_GENERATION_KEY], super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self.cached_response([store_generation_key(pk)], super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response([GLOBAL_GENERATION_KEY], super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return await self.acached_response([store_generation_key(pk)], super().aretrieve, request, *args, **kwargs)
+
+    def response_cache_key(self, request, generations):
+        query = sorted((key, values) for key, values in request.query_params.lists())
+        parts = [
+            request.get_host(),
+            request.path,
+            repr(query),
+            request.accepted_renderer.format,
+            repr(generations),
+            "replica" if reading_from_replica() else "primary",
+        ]
+        if any(param in request.query_params for param in self.time_dependent_params):
+            parts.append(timezone.now().strftime("%Y-%m-%dT%H:%M"))
+        return "stores:response:" + hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def response_etag(self, key):
+        return quote_etag(key.rsplit(":", 1)[1])
+
+    def not_modified(self, request, etag):
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return None
+
+    def cached_response(self, generation_keys, view, request, *args, **kwargs):
+        key = self.response_cache_key(request, get_generations(generation_keys))
+        etag = self.response_etag(key)
+        if response := self.not_modified(request, etag):
+            return response
+
+        data = cache.get(key)
+        if data is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, self.cache_timeout)
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        return response
+
+    async def acached_response(self, generation_keys, view, request, *args, **kwargs):
+        # cached_response() for the coroutine actions of AsyncReadsMixin
+        key = self.response_cache_key(request, await aget_generations(generation_keys))
+        etag = self.response_etag(key)
+        if response := self.not_modified(request, etag):
+            return response
+
+        data = await cache.aget(key)
+        if data is None:
+            response = await view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            await cache.aset(key, response.data, self.cache_timeout)
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        return response
+
+
+class NonAtomicReadsMixin(ViewSetBase):
+    """
+    Run the read-only actions of a viewset outside a transaction.
+
+    ATOMIC_REQUESTS wraps a whole view function, and one view serves both
+    reads and writes (GET and POST on the list URL). The view is marked
+    non-atomic instead and dispatch() opens the transactions itself for
+    every action not in ``non_atomic_actions``. DRF's exception handler
+    still rolls those back on handled errors.
+    """
+
+    non_atomic_actions: tuple[str, ...] = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        for alias in connections:
+            transaction.non_atomic_requests(using=alias)(view)
+        return view
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.action_map.get(request.method.lower()) in self.non_atomic_actions:
+            return super().dispatch(request, *args, **kwargs)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                if connection.settings_dict["ATOMIC_REQUESTS"]:
+                    stack.enter_context(transaction.atomic(using=connection.alias))
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaReadsMixin(ViewSetBase):
+    """
+    Serve the read-only actions of a viewset from the read replicas.
+
+    After a successful write through such a viewset the user's reads stay on
+    the primary for DATABASE_REPLICA_PIN_SECONDS, so they always see their
+    own changes even if the replicas lag behind.
+    """
+
+    replica_actions: tuple[str, ...] = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and not cache.get(self.primary_pin_key(request)):
+            self._replica_reads = read_from_replicas()
+            self._replica_reads.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        replica_reads = self.__dict__.pop("_replica_reads", None)
+        if replica_reads is not None:
+            replica_reads.__exit__(None, None, None)
+        elif request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400 and replica_aliases():
+            cache.set(self.primary_pin_key(request), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def primary_pin_key(self, request):
+        return f"db:primary-pin:{request.user.pk}"
+
+
+class AsyncReadsMixin(ViewSetBase):
+    """
+    Serve the read-only actions of a viewset from a coroutine.
+
+    DRF views are synchronous, so under ASGI every request would hold a
+    worker thread for as long as it waits on the database and the cache.
+    as_view() returns a coroutine view instead: ``async_actions`` run through
+    their ``a<action>()`` methods, which use the async ORM, and every other
+    action through the regular view in a worker thread. Async actions never
+    run in a transaction, so they must not write.
+    """
+
+    async_actions: tuple[str, ...] = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if "get" in actions and "head" not in actions:
+            actions["head"] = actions["get"]
+        async_methods = {method for method, action in actions.items() if action in cls.async_actions}
+        if not async_methods:
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if request.method.lower() not in async_methods:
+                return await sync_view(request, *args, **kwargs)
+            # What ViewSetMixin.as_view() sets up before calling dispatch()
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Keeps cls, actions, csrf_exempt and friends for the router and the schema
+        return update_wrapper(async_view, view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        # APIView.dispatch() for the async actions
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication, permissions and throttling are synchronous
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def alist(self, request, *args, **kwargs):
+        # Filter backends are synchronous and some filters query the database
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(await self.aserializer_data(serializer))
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(await self.aserializer_data(serializer))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    async def aget_object(self):
+        # GenericAPIView.get_object() with the lookup done by the async ORM,
+        # filtering runs in a thread as for alist()
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aserializer_data(self, serializer):
+        # Serializers reading more rows provide adata(), the others only get
+        # prefetched instances
+        if hasattr(serializer, "adata"):
+            return await serializer.adata()
+        return serializer.data
+
+    async def apaginate_queryset(self, queryset):
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, "apaginate_queryset"):
+            return await paginator.apaginate_queryset(queryset, self.request, view=self)
+        # DRF's own paginators read the page inline, run them in a worker thread
+        return await sync_to_async(paginator.paginate_queryset)(queryset, self.request, view=self)
+
+
+class SparseFieldsetsMixin(ViewSetBase):
+    """
+    Let clients pick the fields of read responses with ``?fields=`` and ``?omit=``.
+
+    Both take comma separated field names, dotted for nested fields (e.g.
+    ``?fields=id,address.city``). The serializer only renders the selected
+    fields and ``setup_eager_loading()`` only reads what they need. Writes
+    always get the full representation.
+    """
+
+    sparse_actions: tuple[str, ...] = ("list", "retrieve")
+    fields_param = "fields"
+    omit_param = "omit"
+
+    @property
+    def selected_fields(self):
+        if not hasattr(self, "_selected_fields"):
+            self._selected_fields = self.select_fields()
+        return self._selected_fields
+
+    def select_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+        tree = field_tree(self.get_serializer_class())  # type: ignore[arg-type]  # see field_tree()
+        paths = {}
+        for param in (self.fields_param, self.omit_param):
+            value = self.request.query_params.get(param)
+            try:
+                paths[param] = None if value is None else field_paths(tree, value)
+            except ValueError as e:
+                raise APIValidationError({param: [str(e)]})
+        return select_fields(tree, fields=paths[self.fields_param], omit=paths[self.omit_param] or ())
+
+    def get_serializer(self, *args, **kwargs):
+        if self.selected_fields is not None:
+            kwargs.setdefault("fields", self.selected_fields)
+        return super().get_serializer(*args, **kwargs)
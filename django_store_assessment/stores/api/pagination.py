@@ -0,0 +1,39 @@
+from typing import cast
+
+from django.core.paginator import InvalidPage
+from django.db.models import QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class StorePageNumberPagination(PageNumberPagination):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # paginate_queryset() for async views: the count and the page are
+        # read with the async ORM, everything else is the same
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached property, so page() will not query it again
+        paginator.__dict__["count"] = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        # page() only slices the queryset
+        self.page.object_list = [obj async for obj in cast(QuerySet, self.page.object_list)]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+
+class StoreCursorPagination(CursorPagination):
+    # Keyset pagination on the primary key: every page is a single
+    # "WHERE id > <cursor> ORDER BY id LIMIT n" with no COUNT(*) or OFFSET,
+    # so deep pages cost the same as the first one
+    ordering = "id"
@@ -1,37 +1,276 @@
+import functools
+import itertools
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, cast
+
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
+from rest_framework.utils.serializer_helpers import ReturnList
 
+from django_store_assessment.stores.cache import invalidate_stores
+from django_store_assessment.stores.copy import copy_rows
+from django_store_assessment.stores.geocoding import geocode_addresses
 from django_store_assessment.stores.models import Address, OpeningHours, Store
+from django_store_assessment.stores.schedule import default_timezone, open_intervals, zoned_intervals
+from django_store_assessment.stores.search import store_search_vector
+from django_store_assessment.utils.timing import span
+
+if TYPE_CHECKING:
+    # What the mixins below expect from the serializers they are combined with
+    SerializerBase = serializers.BaseSerializer
+    ModelSerializerBase = serializers.ModelSerializer
+else:
+    SerializerBase = ModelSerializerBase = object
+
+
+@functools.cache
+def field_tree(serializer_class):
+    """Map the field names of a serializer to the field trees of nested serializers, or None."""
+    tree = {}
+    for name, field in serializer_class().fields.items():
+        field = getattr(field, "child", field)
+        if isinstance(field, serializers.BaseSerializer):
+            # The stubs declare BaseSerializer.__hash__ such that serializer classes are not Hashable
+            tree[name] = field_tree(type(field))  # type: ignore[arg-type]
+        else:
+            tree[name] = None
+    return tree
+
+
+@functools.cache
+def value_converters(serializer_class):
+    """``to_representation()`` of the scalar fields of a serializer whose database values need converting."""
+    # Strings and numbers come back from the database as they are rendered
+    as_is = (
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.FloatField,
+        serializers.ChoiceField,
+        serializers.BaseSerializer,
+    )
+    return {
+        name: field.to_representation
+        for name, field in serializer_class().fields.items()
+        if not isinstance(field, as_is)
+    }
+
+
+def field_paths(tree, value):
+    """Split comma separated, dotted field names such as ``id,address.city``; ValueError if one is not in ``tree``."""
+    paths = []
+    for name in (name.strip() for name in value.split(",")):
+        if not name:
+            continue
+        path = name.split(".")
+        node = tree
+        for part in path:
+            if node is None or part not in node:
+                raise ValueError(f"Unknown field: {name}")
+            node = node[part]
+        paths.append(path)
+    return paths
+
+
+def select_fields(tree, fields=None, omit=()):
+    """
+    Return the part of a field tree selected by ``field_paths()``.
+
+    Everything is selected unless ``fields`` is given, then the ``omit``
+    paths are removed.
+    """
+
+    def subtree(tree, path):
+        name, *rest = path
+        return {name: subtree(tree[name], rest) if rest else tree[name]}
+
+    def merge(a, b):
+        merged = dict(a)
+        for name, node in b.items():
+            merged[name] = merge(merged[name], node) if merged.get(name) is not None else node
+        return merged
+
+    def remove(selection, path):
+        name, *rest = path
+        if name not in selection:
+            return selection
+        if not rest:
+            return {key: node for key, node in selection.items() if key != name}
+        return {**selection, name: remove(selection[name], rest)}
+
+    selection = tree
+    if fields is not None:
+        selection = {}
+        for path in fields:
+            selection = merge(selection, subtree(tree, path))
+    for path in omit:
+        selection = remove(selection, path)
+    return selection
 
 
-class AddressSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin(ModelSerializerBase):
+    """Serialize only the fields in a ``fields`` tree, see ``select_fields()``."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected_fields = fields
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.selected_fields is None:
+            return fields
+        for name, subtree in self.selected_fields.items():
+            # Nested serializers of this instance are copies, safe to narrow
+            nested = cast(SparseFieldsMixin, getattr(fields[name], "child", fields[name]))
+            nested.selected_fields = subtree
+        return {name: field for name, field in fields.items() if name in self.selected_fields}
+
+
+def forget_moved_coordinates(address, address_data):
+    # An address that moves without new coordinates is looked up again when saved
+    if not {"latitude", "longitude"} & address_data.keys() and any(
+        getattr(address, attr) != value for attr, value in address_data.items()
+    ):
+        address.latitude = address.longitude = None
+
+
+class AddressSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Address
-        fields = ["street", "city", "state", "postal_code", "country"]
+        fields = ["street", "city", "state", "postal_code", "country", "latitude", "longitude"]
+
+    def validate(self, attrs):
+        # Mirror the address_coordinates_together constraint, one without the other is no location
+        if ("latitude" in attrs) != ("longitude" in attrs) or (attrs.get("latitude") is None) != (
+            attrs.get("longitude") is None
+        ):
+            raise serializers.ValidationError("latitude and longitude must be given together")
+        return attrs
+
+    def update(self, instance, validated_data):
+        forget_moved_coordinates(instance, validated_data)
+        return super().update(instance, validated_data)
 
 
-class OpeningHoursSerializer(serializers.ModelSerializer):
+class OpeningHoursSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = OpeningHours
         fields = ["weekday", "from_hour", "to_hour"]
 
+    def validate(self, attrs):
+        # Partial writes skip the required check, yet a slot is only
+        # complete with all of its fields
+        values = {name: attrs.get(name, getattr(self.instance, name, None)) for name in self.Meta.fields}
+        missing = [name for name, value in values.items() if value is None]
+        if missing:
+            raise serializers.ValidationError({name: self.error_messages["required"] for name in missing})
+        # Mirror OpeningHours.clean() so that bulk writes, which never call
+        # save(), reject invalid slots during validation
+        if values["from_hour"] == values["to_hour"]:
+            raise serializers.ValidationError("from_hour and to_hour must differ")
+        return attrs
+
+
+def opening_hours_key(oh_data):
+    return oh_data["weekday"], oh_data["from_hour"], oh_data["to_hour"]
+
+
+class TimedDataMixin(SerializerBase):
+    """Report the time spent building response data as the "serialize" Server-Timing metric."""
+
+    @property
+    def data(self):
+        with span("serialize"):
+            return super().data
 
-class StoreSerializer(serializers.ModelSerializer):
+
+class StoreListSerializer(TimedDataMixin, serializers.ListSerializer):
+    def create(self, validated_data):
+        # Write the whole batch with one bulk_create per table instead of
+        # a handful of queries per store
+        with transaction.atomic():
+            addresses = [Address(**item["address"]) for item in validated_data if item.get("address")]
+            # bulk_create() does not call save(), which geocodes single addresses
+            geocode_addresses(addresses)
+            addresses = Address.objects.bulk_create(addresses)
+
+            address_iter = iter(addresses)
+            stores = []
+            for item in validated_data:
+                slots = [opening_hours_key(oh_data) for oh_data in item.get("opening_hours", [])]
+                address = next(address_iter) if item.get("address") else None
+                timezone = item.get("timezone", default_timezone())
+                intervals = open_intervals(slots)
+                stores.append(
+                    Store(
+                        name=item["name"],
+                        timezone=timezone,
+                        address=address,
+                        open_intervals=intervals,
+                        zoned_open_intervals=zoned_intervals(intervals, timezone),
+                        search_vector=store_search_vector(item["name"], address),
+                    )
+                )
+            stores = Store.objects.bulk_create(stores)
+
+            # Several through rows per store, the biggest insert of the batch
+            links = [
+                (store.pk, slot)
+                for store, item in zip(stores, validated_data)
+                for slot in {opening_hours_key(oh_data) for oh_data in item.get("opening_hours", [])}
+            ]
+            OpeningHours.objects.link(
+                (slot for _, slot in links),
+                lambda opening_hours: copy_rows(
+                    Store.opening_hours.through,
+                    ["store_id", "openinghours_id"],
+                    ((store_id, opening_hours[slot].pk) for store_id, slot in links),
+                ),
+            )
+            # bulk_create() sends no signals, so invalidate cached responses here
+            invalidate_stores()
+        return stores
+
+
+class StoreSerializer(TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer):
     address = AddressSerializer(required=False)
     opening_hours = OpeningHoursSerializer(many=True, required=False)
 
+    @staticmethod
+    def setup_eager_loading(queryset, fields=None):
+        # Load the nested address and opening hours up front so that
+        # serializing a page of stores runs a fixed number of queries.
+        # Given the selected field tree, only read what will be serialized.
+        if fields is None:
+            return queryset.select_related("address").prefetch_related("opening_hours")
+
+        # Scalar fields are columns of their own, nested ones have a subtree
+        columns = [name for name, subtree in fields.items() if subtree is None and name != "id"]
+        if "address" in fields:
+            queryset = queryset.select_related("address")
+            columns += ["address", *(f"address__{name}" for name in fields["address"])]
+        if "opening_hours" in fields:
+            opening_hours = OpeningHours.objects.only(*fields["opening_hours"])
+            queryset = queryset.prefetch_related(Prefetch("opening_hours", queryset=opening_hours))
+        return queryset.only("id", *columns)
+
     def create(self, validated_data):
         address_data = validated_data.pop("address", None)
         address = None
         if address_data:
             address = Address.objects.create(**address_data)
 
-        # Handle optional opening_hours
-        opening_hours_data = validated_data.pop("opening_hours", [])
-        store = Store.objects.create(address=address, **validated_data)
+        # Handle optional opening_hours, hot slots are served by the slot cache
+        slots = {opening_hours_key(oh_data) for oh_data in validated_data.pop("opening_hours", [])}
+        store = Store.objects.create(address=address, open_intervals=open_intervals(slots), **validated_data)
 
-        for oh_data in opening_hours_data:
-            opening_hour, _ = OpeningHours.objects.get_or_create(**oh_data)
-            store.opening_hours.add(opening_hour)
+        Through = Store.opening_hours.through
+        OpeningHours.objects.link(
+            slots,
+            lambda opening_hours: Through.objects.bulk_create(
+                Through(store_id=store.pk, openinghours_id=oh.pk) for oh in opening_hours.values()
+            ),
+        )
 
         return store
 
@@ -40,20 +279,20 @@ class StoreSerializer(serializers.ModelSerializer):
         address_data = validated_data.pop("address", None)
         if address_data:
             if instance.address:
-                # Update existing address
-                Address.objects.filter(id=instance.address.id).update(**address_data)
-                instance.address.refresh_from_db()  # Refresh the instance's address
+                forget_moved_coordinates(instance.address, address_data)
+                # Update existing address, saving it keeps search vectors of its stores current
+                for attr, value in address_data.items():
+                    setattr(instance.address, attr, value)
+                instance.address.save()
             else:
                 # Create new address and associate with store
                 address = Address.objects.create(**address_data)
                 instance.address = address
 
-        # Handle opening_hours update
-        opening_hours_data = validated_data.pop("opening_hours", [])
-        instance.opening_hours.clear()
-        for oh_data in opening_hours_data:
-            oh_obj, _ = OpeningHours.objects.get_or_create(**oh_data)
-            instance.opening_hours.add(oh_obj)
+        # Handle opening_hours update, leaving the schedule alone when omitted
+        opening_hours_data = validated_data.pop("opening_hours", None)
+        if opening_hours_data is not None:
+            self.sync_opening_hours(instance, opening_hours_data)
 
         # Update other fields of the Store instance
         for attr, value in validated_data.items():
@@ -62,6 +301,145 @@ class StoreSerializer(serializers.ModelSerializer):
 
         return instance
 
+    def sync_opening_hours(self, instance, opening_hours_data):
+        # Only touch the through rows that actually change. The current set
+        # comes from the prefetch cache when the view loaded one.
+        slots = {opening_hours_key(oh_data) for oh_data in opening_hours_data}
+        current_ids = {opening_hours.pk for opening_hours in instance.opening_hours.all()}
+        Through = Store.opening_hours.through
+
+        def relink(desired):
+            desired_ids = {opening_hours.pk for opening_hours in desired.values()}
+            removed_ids = current_ids - desired_ids
+            if removed_ids:
+                Through.objects.filter(store_id=instance.pk, openinghours_id__in=removed_ids).delete()
+            added_ids = desired_ids - current_ids
+            if added_ids:
+                Through.objects.bulk_create(Through(store_id=instance.pk, openinghours_id=pk) for pk in added_ids)
+
+        OpeningHours.objects.link(slots, relink)
+
+        # Written by the instance.save() at the end of update()
+        instance.open_intervals = open_intervals(slots)
+
     class Meta:
         model = Store
-        fields = ["id", "name", "address", "opening_hours"]
+        fields = ["id", "name", "timezone", "address", "opening_hours"]
+        list_serializer_class = StoreListSerializer
+
+
+class StoreRowSerializer:
+    """
+    Read-only ``StoreSerializer(many=True)`` for ``.values()`` rows, see ``setup_rows()``.
+
+    Serializer fields cost a few lookups and method calls per value, for
+    every store. This builds the same dicts, in the same field order, from
+    plain rows, with the opening hours of a whole page read in one query.
+    """
+
+    many = True
+
+    def __init__(self, instance=None, fields=None, using=None, **kwargs):
+        self.instance = instance
+        # Database of the opening hours, that of the rows when they are read lazily
+        self.using = using
+        tree = field_tree(StoreSerializer)
+        selected = tree if fields is None else fields
+        # Field order of StoreSerializer, whatever the order of the selection
+        self.store_fields = [name for name in tree if name in selected]
+        self.address_fields = [name for name in tree["address"] if name in selected.get("address", ())]
+        self.opening_hours_fields = [
+            name for name in tree["opening_hours"] if name in selected.get("opening_hours", ())
+        ]
+        self.converters = {
+            **value_converters(StoreSerializer),
+            **{f"address__{name}": convert for name, convert in value_converters(AddressSerializer).items()},
+        }
+        self.opening_hours_converters = value_converters(OpeningHoursSerializer)
+
+    @staticmethod
+    def setup_rows(queryset, fields=None):
+        # The columns needed by the selected fields, plus the id that the
+        # opening hours and cursor pagination are keyed on
+        tree = field_tree(StoreSerializer)
+        selected = tree if fields is None else fields
+        columns = ["id", *(name for name, subtree in selected.items() if subtree is None and name != "id")]
+        if "address" in selected:
+            columns += ["address", *(f"address__{name}" for name in tree["address"] if name in selected["address"])]
+        return queryset.values(*columns)
+
+    @property
+    def data(self):
+        with span("serialize"):
+            rows = list(self.instance)
+            return self.return_list(self.to_representations(rows, self.opening_hours(rows)))
+
+    async def adata(self):
+        # data for async views, reading the opening hours with the async ORM
+        with span("serialize"):
+            rows = list(self.instance)
+            opening_hours = (
+                [row async for row in self.opening_hours_queryset(rows)] if self.queries_opening_hours(rows) else []
+            )
+            return self.return_list(self.to_representations(rows, opening_hours))
+
+    def return_list(self, representations):
+        # Like ListSerializer.data, the browsable API only reads the serializer's duck-typed attributes
+        return ReturnList(representations, serializer=cast(serializers.BaseSerializer, self))
+
+    def iter_representations(self, rows, chunk_size):
+        """Yield the representation of every row, reading the opening hours ``chunk_size`` stores at a time."""
+        rows = iter(rows)
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            yield from self.to_representations(chunk, self.opening_hours(chunk))
+
+    def queries_opening_hours(self, rows):
+        return rows and "opening_hours" in self.store_fields
+
+    def opening_hours_queryset(self, rows):
+        # The order of the opening_hours prefetch, i.e. OpeningHours.Meta.ordering
+        return (
+            Store.opening_hours.through.objects.using(self.using)
+            .filter(store_id__in=[row["id"] for row in rows])
+            .order_by(*(f"openinghours__{name}" for name in OpeningHours._meta.ordering or ()))
+            .values_list("store_id", *(f"openinghours__{name}" for name in self.opening_hours_fields))
+        )
+
+    def opening_hours(self, rows):
+        return list(self.opening_hours_queryset(rows)) if self.queries_opening_hours(rows) else []
+
+    def to_representations(self, rows, opening_hours):
+        converters = self.converters
+        hours_converters = [self.opening_hours_converters.get(name) for name in self.opening_hours_fields]
+        hours_by_store = defaultdict(list)
+        for store_id, *values in opening_hours:
+            hours_by_store[store_id].append(
+                {
+                    name: value if convert is None or value is None else convert(value)
+                    for name, convert, value in zip(self.opening_hours_fields, hours_converters, values)
+                }
+            )
+
+        representations = []
+        for row in rows:
+            ret: dict[str, Any] = {}
+            for name in self.store_fields:
+                if name == "address":
+                    if row["address"] is None:
+                        ret[name] = None
+                    else:
+                        ret[name] = {
+                            field: self.convert(converters, f"address__{field}", row[f"address__{field}"])
+                            for field in self.address_fields
+                        }
+                elif name == "opening_hours":
+                    ret[name] = hours_by_store.get(row["id"], [])
+                else:
+                    ret[name] = self.convert(converters, name, row[name])
+            representations.append(ret)
+        return representations
+
+    @staticmethod
+    def convert(converters, name, value):
+        convert = converters.get(name)
+        return value if convert is None or value is None else convert(value)
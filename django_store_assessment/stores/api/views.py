@@ -1,17 +1,55 @@
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
-from django_store_assessment.stores.api.serializers import AddressSerializer, OpeningHoursSerializer, StoreSerializer
+from django_store_assessment.stores.api.export import EXPORT_FORMATS
+from django_store_assessment.stores.api.filters import StoreFilter
+from django_store_assessment.stores.api.mixins import (
+    AsyncReadsMixin,
+    CachedReadMixin,
+    NonAtomicReadsMixin,
+    ReplicaReadsMixin,
+    SparseFieldsetsMixin,
+)
+from django_store_assessment.stores.api.pagination import StoreCursorPagination, StorePageNumberPagination
+from django_store_assessment.stores.api.serializers import (
+    AddressSerializer,
+    OpeningHoursSerializer,
+    StoreRowSerializer,
+    StoreSerializer,
+)
+from django_store_assessment.stores.cache import GLOBAL_GENERATION_KEY
 from django_store_assessment.stores.models import Address, OpeningHours, Store
+from django_store_assessment.stores.search import search_stores
 
 # Create your views here.
 
 
-class StoreViewSet(viewsets.ModelViewSet):
-    queryset = Store.objects.all()
+class StoreViewSet(
+    ReplicaReadsMixin,
+    NonAtomicReadsMixin,
+    CachedReadMixin,
+    SparseFieldsetsMixin,
+    AsyncReadsMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Store.objects.order_by("id")
+    # No BEGIN/COMMIT round trips for reads, writes keep ATOMIC_REQUESTS
+    non_atomic_actions = ("list", "retrieve", "export", "search")
+    replica_actions = non_atomic_actions
+    # ?fields= and ?omit= apply to these, exports always have every column
+    sparse_actions = ("list", "retrieve", "search")
+    # Read-only actions serialized from .values() rows by StoreRowSerializer
+    row_actions = ("list", "search", "export")
     serializer_class = StoreSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = [
+    filterset_class = StoreFilter
+    # ?search= substring matching, kept apart from the filters: not every
+    # filterable field (e.g. timezone) is text worth searching
+    search_fields = [
         "name",
         "address__street",
         "address__city",
@@ -22,10 +60,95 @@ class StoreViewSet(viewsets.ModelViewSet):
         "opening_hours__from_hour",
         "opening_hours__to_hour",
     ]
-    search_fields = filterset_fields
+    pagination_class = StorePageNumberPagination
+    # Clients opt in to keyset pagination with ?pagination=cursor
+    pagination_query_param = "pagination"
+    cursor_pagination_class = StoreCursorPagination
+    # Query parameter holding the terms for the ranked full-text search action
+    search_terms_param = "q"
+    time_dependent_params = ("open_now",)
+    # Query parameter selecting the export format, ?format= is taken by DRF
+    export_format_param = "output"
+    # Rows fetched from the server-side cursor (and prefetched) per round trip
+    export_chunk_size = 2000
+    # Upper bound on the number of stores accepted by a single bulk request
+    bulk_max_items = 5000
 
+    def get_queryset(self):
+        if self.action in self.row_actions:
+            return StoreRowSerializer.setup_rows(super().get_queryset(), self.selected_fields)
+        return StoreSerializer.setup_eager_loading(super().get_queryset(), self.selected_fields)
 
-class AddressViewSet(viewsets.ModelViewSet):
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.row_actions and kwargs.get("many"):
+            kwargs.setdefault("fields", self.selected_fields)
+            return StoreRowSerializer(*args, **kwargs)
+        return super().get_serializer(*args, **kwargs)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            # Search results are ordered by rank and proximity results by
+            # distance, which keyset pagination on id would discard
+            if (
+                request is not None
+                and self.action != "search"
+                and "near" not in request.query_params
+                and request.query_params.get(self.pagination_query_param) == "cursor"
+            ):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        # The whole batch is validated first; errors are reported per item,
+        # aligned with the submitted list, and nothing is written
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.bulk_max_items)
+        serializer.is_valid(raise_exception=True)
+        stores = serializer.save()
+        return Response({"ids": [store.pk for store in stores]}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False)
+    def export(self, request):
+        output = request.query_params.get(self.export_format_param, "ndjson")
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({self.export_format_param: [f"Choose one of: {', '.join(EXPORT_FORMATS)}."]})
+        content_type, render = EXPORT_FORMATS[output]
+
+        # Stream every matching store through a server-side cursor; opening
+        # hours are read per chunk, so memory does not grow with the export
+        queryset = self.filter_queryset(self.get_queryset())
+        # Choose the database now, the rows and their opening hours are only
+        # read once the view has returned
+        stores = queryset.using(queryset.db).iterator(chunk_size=self.export_chunk_size)
+        serializer = self.get_serializer(many=True, using=queryset.db)
+        rows = serializer.iter_representations(stores, self.export_chunk_size)
+
+        response = StreamingHttpResponse(render(rows), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="stores.{output}"'
+        return response
+
+    @action(detail=False)
+    def search(self, request):
+        return self.cached_response([GLOBAL_GENERATION_KEY], self.ranked_search, request)
+
+    def ranked_search(self, request):
+        # Matches ?q= against the precomputed search vectors, best matches first.
+        # The regular filters still apply on top.
+        terms = request.query_params.get(self.search_terms_param, "").strip()
+        if not terms:
+            raise ValidationError({self.search_terms_param: ["This query parameter is required."]})
+
+        queryset = search_stores(self.filter_queryset(self.get_queryset()), terms)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class AddressViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StoresConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "django_store_assessment.stores"
+
+    def ready(self):
+        import django_store_assessment.stores.signals  # noqa: F401
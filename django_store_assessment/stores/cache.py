@@ -0,0 +1,54 @@
+"""
+Generations for the store API response cache.
+
+Cached responses are keyed by the generations they depend on: list responses
+by the global generation, a store's detail response by that store's own one.
+A write replaces the generations it affects, so stale entries are never read
+again and simply expire.
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+GLOBAL_GENERATION_KEY = "stores:generation"
+
+
+def store_generation_key(pk):
+    return f"{GLOBAL_GENERATION_KEY}:{pk}"
+
+
+def new_generation():
+    # Never reuses an old value, even after the cache has been flushed
+    return time.time_ns()
+
+
+def get_generations(keys):
+    generations = cache.get_many(keys)
+    missing = {key: new_generation() for key in keys if key not in generations}
+    if missing:
+        for key, generation in missing.items():
+            cache.add(key, generation, None)
+        # Another process may have won the race, and a cache that drops writes
+        # (e.g. DummyCache) just gets a fresh generation every time
+        generations.update(missing)
+        generations.update(cache.get_many(missing))
+    return [generations[key] for key in keys]
+
+
+async def aget_generations(keys):
+    return await sync_to_async(get_generations)(keys)
+
+
+def bump_generations(keys):
+    generation = new_generation()
+    cache.set_many({key: generation for key in keys}, None)
+
+
+def invalidate_stores(store_ids=()):
+    keys = [GLOBAL_GENERATION_KEY] + [store_generation_key(pk) for pk in store_ids]
+    bump_generations(keys)
+    # Bump again once the data is visible to other connections, otherwise a
+    # concurrent read could cache the old rows under the new generation
+    transaction.on_commit(lambda: bump_generations(keys))
@@ -0,0 +1,107 @@
+import re
+
+from django.db import models
+from django.db.models import Lookup
+
+RANGE_RE = re.compile(r"([\[(])(-?\d*),(-?\d*)([\])])")
+
+
+class IntegerMultiRangeField(models.Field):
+    """
+    A Postgres ``int4multirange`` column.
+
+    In Python the value is a sorted list of half-open ``(lower, upper)``
+    integer tuples. Together with a GiST index, the ``contains`` lookup
+    answers "does any of the ranges contain this point" with a single
+    indexed predicate.
+    """
+
+    description = "Set of integer ranges"
+
+    def db_type(self, connection):
+        return "int4multirange"
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        return "{" + ",".join(f"[{lower},{upper})" for lower, upper in value) + "}"
+
+    def from_db_value(self, value, expression, connection):
+        return self.to_python(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, list):
+            return value
+        if isinstance(value, str):
+            ranges = []
+            for lower_bound, lower, upper, upper_bound in RANGE_RE.findall(value):
+                # Postgres canonicalizes integer ranges to "[)", but be lenient
+                lower = int(lower) + (lower_bound == "(")
+                upper = int(upper) + (upper_bound == "]")
+                ranges.append((lower, upper))
+            return ranges
+        # psycopg 3 hands back a Multirange of Range objects
+        return [(item.lower, item.upper) for item in value]
+
+    def value_to_string(self, obj):
+        return self.get_prep_value(self.value_from_object(obj))
+
+
+@IntegerMultiRangeField.register_lookup
+class MultiRangeContains(Lookup):
+    lookup_name = "contains"
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        return "%s", [int(value)]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} @> ({rhs})::integer", lhs_params + rhs_params
+
+
+class PointField(models.Field):
+    """
+    A Postgres ``point``, in Python an ``(x, y)`` tuple of floats.
+
+    Used for expressions over coordinate columns: with a GiST index on the
+    expression, the ``contained_by`` lookup finds the points inside a box
+    without reading the others.
+    """
+
+    description = "Point"
+
+    def db_type(self, connection):
+        return "point"
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        x, y = value
+        return f"({x},{y})"
+
+    def from_db_value(self, value, expression, connection):
+        return self.to_python(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, tuple):
+            return value
+        x, y = value.strip("()").split(",")
+        return float(x), float(y)
+
+
+@PointField.register_lookup
+class PointContainedBy(Lookup):
+    lookup_name = "contained_by"
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        # A box given as its ((x1, y1), (x2, y2)) corners
+        (x1, y1), (x2, y2) = value
+        return "%s", [f"(({float(x1)},{float(y1)}),({float(x2)},{float(y2)}))"]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} <@ ({rhs})::box", lhs_params + rhs_params
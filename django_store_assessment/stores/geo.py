@@ -0,0 +1,94 @@
+"""
+Proximity search over store addresses.
+
+Addresses keep a latitude and longitude, indexed with GiST as a Postgres
+``point(longitude, latitude)``. Finding the stores within a radius first
+narrows them down to the bounding box of the circle, a single indexed
+containment check, then keeps the ones whose great-circle distance is
+within the radius, nearest first.
+"""
+import math
+
+from django.db.models import F, Func, Q
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+from django_store_assessment.stores.fields import PointField
+
+# Mean earth radius
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 10
+# Bigger circles match a sizeable part of all stores, no index helps with those
+MAX_RADIUS_KM = 1000
+
+
+class Point(Func):
+    """``point(x, y)`` of two expressions, e.g. ``Point("longitude", "latitude")``."""
+
+    function = "point"
+    output_field = PointField()
+
+
+def parse_near(value):
+    """Turn ``"<latitude>,<longitude>"`` (e.g. ``"52.52,13.405"``) into a pair of floats."""
+    try:
+        latitude, longitude = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("Expected <latitude>,<longitude> in decimal degrees")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Latitude must be between -90 and 90, longitude between -180 and 180")
+    return latitude, longitude
+
+
+def bounding_boxes(latitude, longitude, radius_km):
+    """
+    ``((min longitude, min latitude), (max longitude, max latitude))`` boxes covering a circle on the earth.
+
+    Circles crossing the antimeridian need a box on either side of it, and
+    circles around a pole span every longitude.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    min_latitude = latitude - math.degrees(angle)
+    max_latitude = latitude + math.degrees(angle)
+    if min_latitude <= -90 or max_latitude >= 90:
+        return [((-180, max(min_latitude, -90)), (180, min(max_latitude, 90)))]
+
+    # Half the longitude span of the circle, measured where the meridians touch it
+    delta = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+    min_longitude, max_longitude = longitude - delta, longitude + delta
+    if min_longitude < -180:
+        return [
+            ((min_longitude + 360, min_latitude), (180, max_latitude)),
+            ((-180, min_latitude), (max_longitude, max_latitude)),
+        ]
+    if max_longitude > 180:
+        return [
+            ((min_longitude, min_latitude), (180, max_latitude)),
+            ((-180, min_latitude), (max_longitude - 360, max_latitude)),
+        ]
+    return [((min_longitude, min_latitude), (max_longitude, max_latitude))]
+
+
+def distance_km(latitude, longitude, latitude_field="latitude", longitude_field="longitude"):
+    """Haversine distance between a point and the coordinate columns, as an expression."""
+    half_latitude_delta = Radians(F(latitude_field) - latitude) / 2
+    half_longitude_delta = Radians(F(longitude_field) - longitude) / 2
+    a = Power(Sin(half_latitude_delta), 2) + math.cos(math.radians(latitude)) * Cos(Radians(latitude_field)) * Power(
+        Sin(half_longitude_delta), 2
+    )
+    # Rounding can push a past 1 for antipodal points
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, 1.0)))
+
+
+def stores_near(queryset, latitude, longitude, radius_km):
+    """The stores of ``queryset`` within ``radius_km`` of a point, nearest first."""
+    in_boxes = Q()
+    for box in bounding_boxes(latitude, longitude, radius_km):
+        in_boxes |= Q(location__contained_by=box)
+    return (
+        queryset.alias(
+            location=Point("address__longitude", "address__latitude"),
+            distance=distance_km(latitude, longitude, "address__latitude", "address__longitude"),
+        )
+        .filter(in_boxes, distance__lte=radius_km)
+        .order_by("distance", "id")
+    )
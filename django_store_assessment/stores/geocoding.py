@@ -0,0 +1,67 @@
+"""
+Coordinates for store addresses.
+
+The geocoder is pluggable: ``STORES_GEOCODER`` names a ``Geocoder``
+subclass, typically a client for the geocoding service in use. New
+addresses, and addresses whose text changes, are looked up unless the
+client sent their coordinates; the ``geocode_addresses`` command catches up
+on the rest, e.g. after an import. ``OfflineGeocoder`` makes up stable
+coordinates without any network access, for development and tests.
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Geocoder:
+    def geocode(self, address):
+        """``(latitude, longitude)`` of an ``Address``, None if it cannot be found."""
+        raise NotImplementedError
+
+    def geocode_many(self, addresses):
+        """The coordinates of several addresses, override for services with batch lookups."""
+        return [self.geocode(address) for address in addresses]
+
+
+class OfflineGeocoder(Geocoder):
+    """
+    Made up coordinates derived from a hash of the address text.
+
+    Every city gets a place between 55°S and 70°N, its addresses land within
+    ``spread`` degrees of it, so nearby stores still share a city.
+    """
+
+    spread = 0.05
+
+    def geocode(self, address):
+        city_latitude, city_longitude = fractions(address.country, address.state, address.city)
+        street_latitude, street_longitude = fractions(address.street, address.postal_code)
+        latitude = -55 + 125 * city_latitude + self.spread * (2 * street_latitude - 1)
+        longitude = -180 + 360 * city_longitude + self.spread * (2 * street_longitude - 1)
+        return round(latitude, 6), round((longitude + 180) % 360 - 180, 6)
+
+
+def fractions(*parts):
+    """Two numbers in [0, 1) that only depend on the given strings."""
+    digest = hashlib.sha256("\0".join(parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64, int.from_bytes(digest[8:16], "big") / 2**64
+
+
+def get_geocoder():
+    return import_string(settings.STORES_GEOCODER)() if settings.STORES_GEOCODER else None
+
+
+def geocode_addresses(addresses):
+    """Fill in the coordinates of the addresses without any, in place, and return the ones that got some."""
+    geocoder = get_geocoder()
+    missing = [address for address in addresses if address.latitude is None and address.longitude is None]
+    if geocoder is None or not missing:
+        return []
+
+    located = []
+    for address, coordinates in zip(missing, geocoder.geocode_many(missing)):
+        if coordinates is not None:
+            address.latitude, address.longitude = coordinates
+            located.append(address)
+    return located
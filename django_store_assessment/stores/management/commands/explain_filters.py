@@ -0,0 +1,89 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from django_store_assessment.stores.api.filters import StoreFilter
+from django_store_assessment.stores.models import Address, OpeningHours, Store
+
+# Filters that are not backed by a model field need an explicit sample value
+SAMPLE_VALUES = {
+    "open_at": "1T12:00",
+    "open_now": "true",
+    "near": "48.8566,2.3522",
+    # Only a parameter of near
+    "radius": None,
+}
+
+
+def filtered_full_scans(plan):
+    """
+    Yield the relations that an EXPLAIN (FORMAT JSON) plan reads in full to evaluate a filter.
+
+    An index scan without an index condition walks the whole index, which is
+    what the planner falls back to when sequential scans are disabled. Full
+    scans without a filter only feed a join and are not a missing index.
+    """
+    node_type = plan["Node Type"]
+    full_scan = node_type == "Seq Scan" or (
+        node_type in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan
+    )
+    if full_scan and "Filter" in plan:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from filtered_full_scans(child)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN for every filter declared on StoreViewSet against the current (seeded) "
+        "database and fail if any of them can only be answered by scanning a whole table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-analyze", action="store_false", dest="analyze", help="Skip ANALYZE before explaining."
+        )
+
+    def handle(self, *args, **options):
+        if not Store.objects.exists():
+            raise CommandError("There are no stores to sample filter values from, seed the database first.")
+
+        if options["analyze"]:
+            with connection.cursor() as cursor:
+                for model in (Store, Address, OpeningHours):
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+        failures = []
+        for name, declared_filter in StoreFilter.base_filters.items():
+            value = self.sample_value(name, declared_filter)
+            if value is None:
+                self.stdout.write(self.style.WARNING(f"{name}: no sample value, skipped"))
+                continue
+
+            plan = self.explain(StoreFilter(data={name: value}, queryset=Store.objects.all()).qs)
+            scanned = sorted(set(filtered_full_scans(plan)))
+            if scanned:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}={value}: full scan of {', '.join(scanned)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{name}={value}: indexed"))
+            if options["verbosity"] > 1:
+                self.stdout.write(json.dumps(plan, indent=2))
+
+        if failures:
+            raise CommandError(f"Filters without a usable index: {', '.join(failures)}")
+
+    def sample_value(self, name, declared_filter):
+        if name in SAMPLE_VALUES:
+            return SAMPLE_VALUES[name]
+        lookup = declared_filter.field_name
+        value = Store.objects.filter(**{f"{lookup}__isnull": False}).values_list(lookup, flat=True).first()
+        return None if value is None else str(value)
+
+    def explain(self, queryset):
+        # With sequential scans priced out, a full scan left in the plan means
+        # the planner has no index it could use for the filter
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            return json.loads(queryset.explain(format="json"))[0]["Plan"]
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from django_store_assessment.stores.cache import invalidate_stores
+from django_store_assessment.stores.geocoding import geocode_addresses, get_geocoder
+from django_store_assessment.stores.models import Address
+
+
+class Command(BaseCommand):
+    help = (
+        "Look up the coordinates of every address without any using the STORES_GEOCODER, e.g. after "
+        "an import or for addresses that predate geocoding. Addresses the geocoder cannot find are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Addresses geocoded per transaction.")
+
+    def handle(self, *args, **options):
+        if get_geocoder() is None:
+            raise CommandError("No geocoder configured, set STORES_GEOCODER.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        started = time.monotonic()
+        seen = located = 0
+        last_pk = 0
+        # Keyset over the pk, addresses the geocoder cannot find are not read again
+        while batch := list(
+            Address.objects.filter(latitude__isnull=True, pk__gt=last_pk).order_by("pk")[: options["batch_size"]]
+        ):
+            last_pk = batch[-1].pk
+            with transaction.atomic():
+                found = geocode_addresses(batch)
+                Address.objects.bulk_update(found, ["latitude", "longitude"])
+            seen += len(batch)
+            located += len(found)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{located} of {seen} addresses located")
+
+        if located:
+            # bulk_update() sends no signals, cached responses include the coordinates
+            invalidate_stores()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Located {located} of {seen} addresses in {elapsed:.1f}s."))
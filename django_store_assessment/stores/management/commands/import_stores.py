@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from django_store_assessment.stores.api.export import ADDRESS_COLUMNS, COORDINATE_COLUMNS, IMPORT_FORMATS
+from django_store_assessment.stores.api.serializers import StoreSerializer, opening_hours_key
+from django_store_assessment.stores.cache import invalidate_stores
+from django_store_assessment.stores.copy import allocate_ids, copy_rows
+from django_store_assessment.stores.geocoding import geocode_addresses
+from django_store_assessment.stores.models import Address, OpeningHours, Store
+from django_store_assessment.stores.schedule import default_timezone, open_intervals
+
+
+class Command(BaseCommand):
+    help = (
+        "Import stores from a CSV or NDJSON file laid out like the /api/stores/export/ output. "
+        "The file is streamed, every row is validated like an API request and valid rows are "
+        "written in batches, one transaction per batch. Invalid rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, - reads standard input.")
+        parser.add_argument(
+            "--format", choices=IMPORT_FORMATS, help="Input format, guessed from the file extension by default."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Stores written per transaction.")
+
+    def handle(self, *args, **options):
+        input_format = options["format"] or os.path.splitext(options["path"])[1].lstrip(".").lower()
+        if input_format not in IMPORT_FORMATS:
+            raise CommandError(f"Cannot tell the format of {options['path']}, pass --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        self.verbosity = options["verbosity"]
+
+        if options["path"] == "-":
+            self.import_rows(IMPORT_FORMATS[input_format](sys.stdin), options["batch_size"])
+            return
+        try:
+            with open(options["path"], newline="", encoding="utf-8") as lines:
+                self.import_rows(IMPORT_FORMATS[input_format](lines), options["batch_size"])
+        except OSError as e:
+            raise CommandError(e)
+
+    def import_rows(self, rows, batch_size):
+        # One serializer validates every row, building its fields per row would dominate
+        serializer = StoreSerializer()
+        self.started = time.monotonic()
+        self.imported = invalid = 0
+        batch = []
+
+        for line_number, row in rows:
+            try:
+                batch.append(serializer.run_validation(row))
+            except ValidationError as e:
+                invalid += 1
+                self.stderr.write(f"Line {line_number}: {e.detail}")
+                continue
+            if len(batch) >= batch_size:
+                self.write_batch(batch)
+                batch = []
+        if batch:
+            self.write_batch(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {self.progress()}, skipped {invalid} invalid rows."))
+
+    def write_batch(self, batch):
+        # Like StoreListSerializer.create(), but with the pks reserved up
+        # front each table is written with a single COPY or INSERT
+        with transaction.atomic():
+            addresses = [Address(**item["address"]) for item in batch if item.get("address")]
+            geocode_addresses(addresses)
+            new_addresses = zip(allocate_ids(Address, len(addresses)), addresses)
+            store_ids = allocate_ids(Store, len(batch))
+
+            address_rows, store_rows = [], []
+            links: list[tuple[int, tuple]] = []
+            for store_id, item in zip(store_ids, batch):
+                address_id = None
+                if item.get("address"):
+                    address_id, address = next(new_addresses)
+                    address_rows.append(
+                        [address_id] + [getattr(address, column) for column in ADDRESS_COLUMNS + COORDINATE_COLUMNS]
+                    )
+                slots = {opening_hours_key(oh_data) for oh_data in item.get("opening_hours", [])}
+                store_rows.append(
+                    (
+                        store_id,
+                        item["name"],
+                        address_id,
+                        open_intervals(slots),
+                        item.get("timezone", default_timezone()),
+                    )
+                )
+                links.extend((store_id, slot) for slot in slots)
+
+            copy_rows(Address, ["id"] + ADDRESS_COLUMNS + COORDINATE_COLUMNS, address_rows)
+            Store.objects.bulk_insert(store_rows)
+            OpeningHours.objects.link(
+                (slot for _, slot in links),
+                lambda opening_hours: copy_rows(
+                    Store.opening_hours.through,
+                    ["store_id", "openinghours_id"],
+                    ((store_id, opening_hours[slot].pk) for store_id, slot in links),
+                ),
+            )
+            invalidate_stores()
+
+        self.imported += len(batch)
+        if self.verbosity > 1:
+            self.stdout.write(self.progress())
+
+    def progress(self):
+        elapsed = time.monotonic() - self.started
+        return f"{self.imported} stores in {elapsed:.1f}s ({self.imported / max(elapsed, 1e-6):.0f} rows/s)"
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Add realistic stores, each with an address and a weekly schedule, for benchmarks and load tests. "
+        "Needs the local requirements (Faker)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, help="Number of stores to add.")
+        parser.add_argument("--batch-size", type=int, default=10_000, help="Stores written per transaction.")
+        parser.add_argument("--seed", type=int, help="Random seed, for a reproducible dataset.")
+
+    def handle(self, *args, **options):
+        # Test-only dependencies, so import them only when the command runs
+        from django_store_assessment.stores.tests.seeding import seed_stores
+
+        if options["count"] < 1 or options["batch_size"] < 1:
+            raise CommandError("count and --batch-size must be at least 1.")
+
+        started = time.monotonic()
+        seed_stores(options["count"], batch_size=options["batch_size"], seed=options["seed"])
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {options['count']} stores in {elapsed:.1f}s ({options['count'] / max(elapsed, 1e-6):.0f}/s)."
+            )
+        )
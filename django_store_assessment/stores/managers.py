@@ -0,0 +1,183 @@
+from functools import reduce
+from operator import or_
+from typing import TYPE_CHECKING
+
+from django.apps import apps
+from django.db import IntegrityError, connection, connections, models, transaction
+from django.db.models import Q
+from psycopg.errors import ForeignKeyViolation
+
+from django_store_assessment.stores.schedule import zoned_intervals
+from django_store_assessment.stores.search import SEARCH_CONFIG
+from django_store_assessment.utils.cache import LocalCache
+
+if TYPE_CHECKING:
+    from django_store_assessment.stores.models import OpeningHours, Store
+
+    OpeningHoursManagerBase = models.Manager[OpeningHours]
+    StoreManagerBase = models.Manager[Store]
+else:
+    OpeningHoursManagerBase = StoreManagerBase = models.Manager
+
+# Process-local map of (weekday, from_hour, to_hour) to OpeningHours pk. Entries
+# are only added once the transaction that read or inserted the row has
+# committed, and expire so that edits made by other processes are picked up.
+slot_cache = LocalCache(maxsize=1024, ttl=300)
+
+
+class OpeningHoursManager(OpeningHoursManagerBase):
+    """Custom manager for the OpeningHours model."""
+
+    def resolve(self, slots):
+        """
+        Map ``(weekday, from_hour, to_hour)`` slots to OpeningHours rows.
+
+        Slots found in the process-local cache cost no query. The others are
+        fetched with one query and the missing ones are inserted with one
+        ``bulk_create``, relying on the unique constraint to settle races
+        with concurrent writers.
+        """
+        return self._resolve(slots)[0]
+
+    def _resolve(self, slots):
+        # resolve(), and the slots whose pk came from the cache
+        resolved = {}
+        pending = set()
+        for slot in set(slots):
+            pk = slot_cache.get(slot)
+            if pk is None:
+                pending.add(slot)
+            else:
+                weekday, from_hour, to_hour = slot
+                resolved[slot] = self.model(pk=pk, weekday=weekday, from_hour=from_hour, to_hour=to_hour)
+        cached = set(resolved)
+        if not pending:
+            return resolved, cached
+
+        fetched = self._fetch(pending)
+        missing = [
+            self.model(weekday=weekday, from_hour=from_hour, to_hour=to_hour)
+            for weekday, from_hour, to_hour in pending - fetched.keys()
+        ]
+        if missing:
+            for opening_hours in missing:
+                # bulk_create() bypasses save(), which is where clean() normally runs
+                opening_hours.clean()
+            self.bulk_create(missing, ignore_conflicts=True)
+            # Conflicting rows come back without a pk, so read them all back
+            fetched.update(self._fetch(pending - fetched.keys()))
+
+        transaction.on_commit(lambda: slot_cache.update({slot: oh.pk for slot, oh in fetched.items()}))
+        resolved.update(fetched)
+        return resolved, cached
+
+    def link(self, slots, insert):
+        """
+        Resolve ``slots`` and pass the result to ``insert()``, which writes the store links to them.
+
+        A cached pk can belong to a slot that another process has deleted
+        since. Links check their foreign key as they are written (migration
+        0010), so ``insert()`` then fails right away, and the cached slots
+        are dropped and resolved again from the database. Without cached
+        slots there is nothing stale and no savepoint is needed.
+        """
+        slots = set(slots)
+        resolved, cached = self._resolve(slots)
+        if not cached:
+            insert(resolved)
+            return resolved
+        try:
+            with transaction.atomic():
+                insert(resolved)
+        except IntegrityError as e:
+            if not isinstance(e.__cause__, ForeignKeyViolation):
+                raise
+            for slot in cached:
+                slot_cache.discard(slot)
+            resolved = self.resolve(slots)
+            insert(resolved)
+        return resolved
+
+    def _fetch(self, slots):
+        query = reduce(
+            or_, (Q(weekday=weekday, from_hour=from_hour, to_hour=to_hour) for weekday, from_hour, to_hour in slots)
+        )
+        return {(oh.weekday, oh.from_hour, oh.to_hour): oh for oh in self.filter(query)}
+
+
+class StoreManager(StoreManagerBase):
+    """Custom manager for the Store model."""
+
+    def timezones(self):
+        """
+        The distinct timezones of all stores.
+
+        A loose index scan: every step looks up the next timezone in the
+        timezone index, so this costs one index probe per timezone rather
+        than a pass over all stores.
+        """
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH RECURSIVE zones (timezone) AS (
+                    (SELECT timezone FROM {table} ORDER BY timezone LIMIT 1)
+                    UNION ALL
+                    SELECT (SELECT timezone FROM {table} WHERE timezone > zones.timezone ORDER BY timezone LIMIT 1)
+                    FROM zones
+                    WHERE zones.timezone IS NOT NULL
+                )
+                SELECT timezone FROM zones WHERE timezone IS NOT NULL
+                """
+            )
+            return [timezone for (timezone,) in cursor.fetchall()]
+
+    def bulk_insert(self, rows):
+        """
+        Insert ``(pk, name, address_id, open_intervals, timezone)`` rows with one statement.
+
+        The search vectors are computed by the database from the stores'
+        address rows, so unlike ``bulk_create()`` with ``store_search_vector()``
+        the statement stays small and every store is written only once. The
+        pks have to be reserved up front, see ``copy.allocate_ids()``.
+        """
+        if not rows:
+            return
+        ids, names, address_ids, intervals, timezones = zip(*rows)
+        zoned = [zoned_intervals(value, timezone) for value, timezone in zip(intervals, timezones)]
+        prep_intervals = self.model._meta.get_field("open_intervals").get_prep_value
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {quote_name(self.model._meta.db_table)}
+                    (id, name, address_id, open_intervals, zoned_open_intervals, timezone, search_vector)
+                SELECT
+                    store.id, store.name, store.address_id, store.open_intervals::int4multirange,
+                    store.zoned_open_intervals::int4multirange, store.timezone,
+                    setweight(to_tsvector(%(config)s, store.name), 'A')
+                    || setweight(
+                        to_tsvector(
+                            %(config)s,
+                            concat_ws(' ', address.street, address.city, address.state, address.postal_code,
+                                      address.country)
+                        ),
+                        'B'
+                    )
+                FROM unnest(
+                    %(ids)s::bigint[], %(names)s::text[], %(address_ids)s::bigint[], %(intervals)s::text[],
+                    %(zoned)s::text[], %(timezones)s::text[]
+                ) AS store (id, name, address_id, open_intervals, zoned_open_intervals, timezone)
+                LEFT JOIN {quote_name(apps.get_model("stores", "Address")._meta.db_table)} AS address
+                    ON address.id = store.address_id
+                """,
+                {
+                    "config": SEARCH_CONFIG,
+                    "ids": list(ids),
+                    "names": list(names),
+                    "address_ids": list(address_ids),
+                    "intervals": [prep_intervals(value) for value in intervals],
+                    "zoned": [prep_intervals(value) for value in zoned],
+                    "timezones": list(timezones),
+                },
+            )
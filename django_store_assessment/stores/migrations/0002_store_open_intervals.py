@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:25
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django_store_assessment.stores.fields
+
+
+# Copies of stores.schedule as of this migration
+def minute_of_week(weekday, time):
+    return (weekday - 1) * 24 * 60 + time.hour * 60 + time.minute
+
+
+def open_intervals(slots):
+    intervals = sorted(
+        (minute_of_week(weekday, from_hour), minute_of_week(weekday, to_hour)) for weekday, from_hour, to_hour in slots
+    )
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def populate_open_intervals(apps, schema_editor):
+    Store = apps.get_model("stores", "Store")
+    for store in Store.objects.prefetch_related("opening_hours").iterator(chunk_size=1000):
+        store.open_intervals = open_intervals(
+            (oh.weekday, oh.from_hour, oh.to_hour) for oh in store.opening_hours.all()
+        )
+        store.save(update_fields=["open_intervals"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stores", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="store",
+            name="open_intervals",
+            field=django_store_assessment.stores.fields.IntegerMultiRangeField(
+                blank=True, default=list, editable=False
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="store",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["open_intervals"], name="store_open_intervals_gist"
+            ),
+        ),
+        migrations.RunPython(populate_open_intervals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:31
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_slots(apps, schema_editor):
+    OpeningHours = apps.get_model("stores", "OpeningHours")
+    Through = apps.get_model("stores", "Store").opening_hours.through
+
+    duplicates = (
+        OpeningHours.objects.values("weekday", "from_hour", "to_hour")
+        .annotate(keep_id=Min("id"), rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for slot in duplicates:
+        duplicate_ids = list(
+            OpeningHours.objects.filter(weekday=slot["weekday"], from_hour=slot["from_hour"], to_hour=slot["to_hour"])
+            .exclude(id=slot["keep_id"])
+            .values_list("id", flat=True)
+        )
+        # Point stores at the surviving row, without creating a second link
+        # for stores that already have it
+        linked = Through.objects.filter(openinghours_id=slot["keep_id"]).values_list("store_id", flat=True)
+        Through.objects.filter(openinghours_id__in=duplicate_ids, store_id__in=linked).delete()
+        moved = Through.objects.filter(openinghours_id__in=duplicate_ids)
+        for row in moved.distinct("store_id").order_by("store_id"):
+            Through.objects.create(store_id=row.store_id, openinghours_id=slot["keep_id"])
+        OpeningHours.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stores", "0002_store_open_intervals"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_slots, migrations.RunPython.noop),
+    ]
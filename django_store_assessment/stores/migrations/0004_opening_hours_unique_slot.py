@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stores", "0003_merge_duplicate_opening_hours"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="openinghours",
+            constraint=models.UniqueConstraint(
+                fields=("weekday", "from_hour", "to_hour"), name="unique_opening_hours_slot"
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+POPULATE_SEARCH_VECTOR = """
+UPDATE stores_store AS store
+SET search_vector =
+    setweight(to_tsvector('simple', store.name), 'A')
+    || setweight(
+        to_tsvector(
+            'simple',
+            coalesce(concat_ws(' ', address.street, address.city, address.state, address.postal_code, address.country), '')
+        ),
+        'B'
+    )
+FROM stores_store AS joined
+LEFT JOIN stores_address AS address ON address.id = joined.address_id
+WHERE store.id = joined.id
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stores", "0004_opening_hours_unique_slot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="store",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="store",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="store_search_vector_gin"),
+        ),
+        migrations.RunSQL(POPULATE_SEARCH_VECTOR, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ("stores", "0005_store_search_vector"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(fields=["country", "state", "city"], name="address_country_state_city_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(fields=["state"], name="address_state_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(fields=["city"], name="address_city_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(fields=["postal_code"], name="address_postal_code_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(fields=["street"], name="address_street_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="openinghours",
+            index=models.Index(fields=["from_hour"], name="opening_hours_from_hour_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="openinghours",
+            index=models.Index(fields=["to_hour"], name="opening_hours_to_hour_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="store",
+            index=models.Index(fields=["name"], name="store_name_idx"),
+        ),
+    ]
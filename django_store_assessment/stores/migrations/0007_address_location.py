@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:46
+
+import django.contrib.postgres.indexes
+import django.core.validators
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+import django_store_assessment.stores.geo
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ("stores", "0006_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="address",
+            name="latitude",
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-90),
+                    django.core.validators.MaxValueValidator(90),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="address",
+            name="longitude",
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-180),
+                    django.core.validators.MaxValueValidator(180),
+                ],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="address",
+            index=django.contrib.postgres.indexes.GistIndex(
+                django_store_assessment.stores.geo.Point("longitude", "latitude"), name="address_location_gist"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="address",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(("latitude__isnull", True), ("longitude__isnull", True)),
+                    models.Q(("latitude__isnull", False), ("longitude__isnull", False)),
+                    _connector="OR",
+                ),
+                name="address_coordinates_together",
+            ),
+        ),
+    ]
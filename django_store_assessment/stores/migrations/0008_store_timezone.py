@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:06
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+import django_store_assessment.stores.fields
+import django_store_assessment.stores.schedule
+
+# Every store starts out in the default timezone, so they all share one band,
+# see schedule.zone_band() and schedule.zoned_intervals()
+FILL_ZONED_OPEN_INTERVALS = """
+UPDATE stores_store AS store
+SET zoned_open_intervals = (
+    SELECT range_agg(int4range(lower(r) + band.start, upper(r) + band.start))
+    FROM unnest(store.open_intervals) AS r
+)
+FROM (SELECT (('x' || left(md5(%s), 7))::bit(28)::integer %% 200003) * 10080 AS start) AS band
+WHERE NOT isempty(store.open_intervals)
+"""
+
+
+def fill_zoned_open_intervals(apps, schema_editor):
+    schema_editor.execute(FILL_ZONED_OPEN_INTERVALS, [django_store_assessment.stores.schedule.default_timezone()])
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ("stores", "0007_address_location"),
+    ]
+
+    operations = [
+        # Existing stores get the site's TIME_ZONE
+        migrations.AddField(
+            model_name="store",
+            name="timezone",
+            field=models.CharField(
+                default=django_store_assessment.stores.schedule.default_timezone,
+                max_length=64,
+                validators=[django_store_assessment.stores.schedule.validate_timezone],
+            ),
+        ),
+        migrations.AddField(
+            model_name="store",
+            name="zoned_open_intervals",
+            field=django_store_assessment.stores.fields.IntegerMultiRangeField(
+                blank=True, default=list, editable=False
+            ),
+        ),
+        migrations.RunPython(fill_zoned_open_intervals, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name="store",
+            index=models.Index(fields=["timezone"], name="store_timezone_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="store",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["zoned_open_intervals"], name="store_zoned_open_intervals_gist"
+            ),
+        ),
+    ]
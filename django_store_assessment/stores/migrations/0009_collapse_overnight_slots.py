@@ -0,0 +1,180 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:40
+
+import datetime
+import hashlib
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import migrations
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+# Before overnight slots, a store open 22:00-02:00 had a slot running to the
+# end of one day, 23:59 being the latest time a slot could close
+END_OF_DAY = datetime.time(23, 59)
+MIDNIGHT = datetime.time(0, 0)
+
+# Copies of stores.schedule as of this migration
+MINUTES_PER_WEEK = 7 * 24 * 60
+ZONE_BANDS = 200003
+
+
+def minute_of_week(weekday, time):
+    return (weekday - 1) * 24 * 60 + time.hour * 60 + time.minute
+
+
+def zoned_intervals(intervals, timezone):
+    band = int(hashlib.md5(timezone.encode()).hexdigest()[:7], 16) % ZONE_BANDS
+    return [(lower + band * MINUTES_PER_WEEK, upper + band * MINUTES_PER_WEEK) for lower, upper in intervals]
+
+
+def chunks(values, size=10_000):
+    values = list(values)
+    return (values[i : i + size] for i in range(0, len(values), size))
+
+
+def slot_ids(OpeningHours, slots):
+    """Create the missing ``(weekday, from_hour, to_hour)`` slots, and return their ids."""
+    OpeningHours.objects.bulk_create(
+        [OpeningHours(weekday=weekday, from_hour=from_hour, to_hour=to_hour) for weekday, from_hour, to_hour in slots],
+        ignore_conflicts=True,
+    )
+    query = reduce(
+        or_, (Q(weekday=weekday, from_hour=from_hour, to_hour=to_hour) for weekday, from_hour, to_hour in slots)
+    )
+    return {(oh.weekday, oh.from_hour, oh.to_hour): oh.pk for oh in OpeningHours.objects.filter(query)}
+
+
+def update_minutes_before_midnight(Store, weekdays, operator):
+    """
+    Add (``operator`` "+") or remove ("-") the minute before midnight of the
+    given weekdays to the ranges of the stores, grouped by the minutes and
+    their timezone. ``weekdays`` maps store ids to lists of weekdays.
+    """
+    groups = defaultdict(list)
+    for ids in chunks(weekdays):
+        for store_id, timezone in Store.objects.filter(id__in=ids).values_list("id", "timezone"):
+            minutes = sorted({minute_of_week(weekday, END_OF_DAY) for weekday in weekdays[store_id]})
+            groups[tuple((minute, minute + 1) for minute in minutes), timezone].append(store_id)
+    prep_intervals = Store._meta.get_field("open_intervals").get_prep_value
+    for (minutes, timezone), store_ids in groups.items():
+        for ids in chunks(store_ids):
+            Store.objects.filter(id__in=ids).update(
+                open_intervals=RawSQL(f"open_intervals {operator} %s::int4multirange", [prep_intervals(minutes)]),
+                zoned_open_intervals=RawSQL(
+                    f"zoned_open_intervals {operator} %s::int4multirange",
+                    [prep_intervals(zoned_intervals(minutes, timezone))],
+                ),
+            )
+
+
+def collapse_overnight_slots(apps, schema_editor):
+    """Replace a slot closing at midnight and the next day's slot opening at midnight by one overnight slot."""
+    OpeningHours = apps.get_model("stores", "OpeningHours")
+    Store = apps.get_model("stores", "Store")
+    Through = Store.opening_hours.through
+
+    # Slots are shared, there are only a few of either kind
+    evening_slots = {oh.pk: oh for oh in OpeningHours.objects.filter(to_hour__gte=END_OF_DAY)}
+    morning_slots = {oh.pk: oh for oh in OpeningHours.objects.filter(from_hour=MIDNIGHT)}
+    evenings = {}
+    mornings = {}
+    rows = Through.objects.filter(openinghours_id__in=evening_slots.keys() | morning_slots.keys())
+    for store_id, pk in rows.values_list("store_id", "openinghours_id").iterator(chunk_size=10_000):
+        if pk in evening_slots:
+            # The earliest opening wins if a day has several slots running to midnight
+            slot = evening_slots[pk]
+            evening = evenings.get((store_id, slot.weekday))
+            if evening is None or slot.from_hour < evening.from_hour:
+                evenings[store_id, slot.weekday] = slot
+        if pk in morning_slots:
+            slot = morning_slots[pk]
+            morning = mornings.get((store_id, slot.weekday))
+            if morning is None or slot.to_hour > morning.to_hour:
+                mornings[store_id, slot.weekday] = slot
+
+    # Store ids by the (evening, morning) pair they get rid of
+    collapsed = defaultdict(list)
+    for (store_id, weekday), evening in evenings.items():
+        morning = mornings.get((store_id, weekday % 7 + 1))
+        # Mornings closing after the evening opens would be a slot of more than a day
+        if morning is None or morning.pk == evening.pk or not MIDNIGHT < morning.to_hour < evening.from_hour:
+            continue
+        collapsed[evening, morning].append(store_id)
+    if not collapsed:
+        return
+
+    overnight_ids = slot_ids(
+        OpeningHours, {(evening.weekday, evening.from_hour, morning.to_hour) for evening, morning in collapsed}
+    )
+    for (evening, morning), store_ids in collapsed.items():
+        overnight_id = overnight_ids[evening.weekday, evening.from_hour, morning.to_hour]
+        for ids in chunks(store_ids):
+            # Stores which already have the overnight slot only lose the pair
+            has_overnight = Through.objects.filter(openinghours_id=overnight_id).values("store_id")
+            Through.objects.filter(store_id__in=ids, openinghours_id=evening.pk).exclude(
+                store_id__in=has_overnight
+            ).update(openinghours_id=overnight_id)
+            Through.objects.filter(store_id__in=ids, openinghours_id__in=[evening.pk, morning.pk]).delete()
+    replaced_ids = {slot.pk for pair in collapsed for slot in pair}
+    OpeningHours.objects.filter(id__in=replaced_ids, stores__isnull=True).delete()
+
+    # The schedules are the same but for the minute before midnight, which
+    # used to be closed
+    weekdays = defaultdict(list)
+    for (evening, _), store_ids in collapsed.items():
+        for store_id in store_ids:
+            weekdays[store_id].append(evening.weekday)
+    update_minutes_before_midnight(Store, weekdays, "+")
+
+
+def split_overnight_slots(apps, schema_editor):
+    """
+    Split every overnight slot into one closing at 23:59 and the next day's
+    slot opening at midnight. The stores are closed the minute before
+    midnight again, the only thing a schedule loses.
+    """
+    OpeningHours = apps.get_model("stores", "OpeningHours")
+    Store = apps.get_model("stores", "Store")
+    Through = Store.opening_hours.through
+
+    overnight_slots = list(OpeningHours.objects.filter(to_hour__lte=F("from_hour")))
+    if not overnight_slots:
+        return
+
+    def halves(slot):
+        # A slot opening at 23:59 or closing at midnight has a single half
+        if slot.from_hour < END_OF_DAY:
+            yield slot.weekday, slot.from_hour, END_OF_DAY
+        if slot.to_hour > MIDNIGHT:
+            yield slot.weekday % 7 + 1, MIDNIGHT, slot.to_hour
+
+    half_ids = slot_ids(OpeningHours, {half for slot in overnight_slots for half in halves(slot)})
+    weekdays = defaultdict(list)
+    for slot in overnight_slots:
+        store_ids = Through.objects.filter(openinghours_id=slot.pk).values_list("store_id", flat=True)
+        for ids in chunks(store_ids.iterator(chunk_size=10_000)):
+            Through.objects.bulk_create(
+                [
+                    Through(store_id=store_id, openinghours_id=half_ids[half])
+                    for store_id in ids
+                    for half in halves(slot)
+                ],
+                ignore_conflicts=True,
+            )
+            for store_id in ids:
+                weekdays[store_id].append(slot.weekday)
+    OpeningHours.objects.filter(id__in=[slot.pk for slot in overnight_slots]).delete()
+
+    update_minutes_before_midnight(Store, weekdays, "-")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stores", "0008_store_timezone"),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_overnight_slots, split_overnight_slots),
+    ]
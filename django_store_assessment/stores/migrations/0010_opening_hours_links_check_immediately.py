@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:10
+
+from django.db import migrations
+
+# Django creates foreign keys DEFERRABLE INITIALLY DEFERRED, so a link to a
+# deleted slot would only fail at commit. Checking it as the link is written
+# lets OpeningHoursManager.link() retry with fresh slots, see managers.py.
+SET_LINK_CHECK = """
+DO $$
+DECLARE
+    name text;
+BEGIN
+    SELECT conname INTO STRICT name FROM pg_constraint
+    WHERE conrelid = 'stores_store_opening_hours'::regclass
+        AND confrelid = 'stores_openinghours'::regclass
+        AND contype = 'f';
+    EXECUTE format('ALTER TABLE stores_store_opening_hours ALTER CONSTRAINT %%I DEFERRABLE INITIALLY %s', name);
+END
+$$
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stores", "0009_collapse_overnight_slots"),
+    ]
+
+    operations = [
+        migrations.RunSQL(SET_LINK_CHECK % "IMMEDIATE", SET_LINK_CHECK % "DEFERRED"),
+    ]
@@ -1,6 +1,21 @@
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from rest_framework.exceptions import ValidationError
 
+from django_store_assessment.stores.fields import IntegerMultiRangeField
+from django_store_assessment.stores.geo import Point
+from django_store_assessment.stores.geocoding import geocode_addresses
+from django_store_assessment.stores.managers import OpeningHoursManager, StoreManager
+from django_store_assessment.stores.schedule import (
+    default_timezone,
+    open_intervals,
+    validate_timezone,
+    zoned_intervals,
+)
+from django_store_assessment.stores.search import store_search_vector
+
 # Create your models here.
 
 
@@ -20,13 +35,24 @@ class OpeningHours(models.Model):
     from_hour = models.TimeField()
     to_hour = models.TimeField()
 
+    objects = OpeningHoursManager()
+
     class Meta:
         ordering = ("weekday", "from_hour")
+        # Slots are shared between stores, so each one must exist only once
+        constraints = [
+            models.UniqueConstraint(fields=["weekday", "from_hour", "to_hour"], name="unique_opening_hours_slot")
+        ]
+        # weekday lookups use the unique constraint's index
+        indexes = [
+            models.Index(fields=["from_hour"], name="opening_hours_from_hour_idx"),
+            models.Index(fields=["to_hour"], name="opening_hours_to_hour_idx"),
+        ]
 
     def clean(self):
-        # Check if from_hour is less than to_hour
-        if self.from_hour >= self.to_hour:
-            raise ValidationError("from_hour must be less than to_hour")
+        # A to_hour before from_hour closes on the next day, see schedule.open_intervals()
+        if self.from_hour == self.to_hour:
+            raise ValidationError("from_hour and to_hour must differ")
 
     def save(self, *args, **kwargs):
         self.clean()
@@ -45,15 +71,92 @@ class Address(models.Model):
     state = models.CharField(max_length=64)
     postal_code = models.CharField(max_length=20)
     country = models.CharField(max_length=50)
+    # Looked up by the geocoder unless given, see geocoding.py
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(latitude__isnull=True, longitude__isnull=True)
+                | models.Q(latitude__isnull=False, longitude__isnull=False),
+                name="address_coordinates_together",
+            )
+        ]
+        # One index per exact filter exposed by StoreViewSet; country lookups
+        # use the leading column of the composite. Proximity searches use the
+        # GiST index on the coordinates as a point, see geo.py.
+        indexes = [
+            models.Index(fields=["country", "state", "city"], name="address_country_state_city_idx"),
+            models.Index(fields=["state"], name="address_state_idx"),
+            models.Index(fields=["city"], name="address_city_idx"),
+            models.Index(fields=["postal_code"], name="address_postal_code_idx"),
+            models.Index(fields=["street"], name="address_street_idx"),
+            GistIndex(Point("longitude", "latitude"), name="address_location_gist"),
+        ]
 
     def __str__(self):
         return f"{self.street}, {self.city}, {self.state}, {self.postal_code}, {self.country}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if geocode_addresses([self]) and kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "latitude", "longitude"}
+        super().save(*args, **kwargs)
+        if not adding:
+            # Store names are read from their own column, so one UPDATE covers every store here
+            self.stores.update(search_vector=store_search_vector(models.F("name"), self))
+
 
 class Store(models.Model):
     name = models.CharField(max_length=100)
     address = models.ForeignKey(Address, on_delete=models.CASCADE, null=True, related_name="stores")
+    # Migration 0010 makes the links' foreign key to OpeningHours DEFERRABLE
+    # INITIALLY IMMEDIATE in SQL only, so OpeningHours.objects.link() sees a
+    # slot deleted elsewhere at insert time. The migration state still has
+    # Django's INITIALLY DEFERRED, any migration that recreates the foreign
+    # key has to run that SQL again.
     opening_hours = models.ManyToManyField(OpeningHours, blank=True, related_name="stores")
+    # IANA name of the timezone the opening hours are in
+    timezone = models.CharField(max_length=64, default=default_timezone, validators=[validate_timezone])
+    # Denormalized copy of opening_hours as minute-of-week ranges, see schedule.py
+    open_intervals = IntegerMultiRangeField(default=list, blank=True, editable=False)
+    # The same ranges in the band of the timezone, for open_now
+    zoned_open_intervals = IntegerMultiRangeField(default=list, blank=True, editable=False)
+    # Name and address text for full-text search, see search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = StoreManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="store_name_idx"),
+            GistIndex(fields=["open_intervals"], name="store_open_intervals_gist"),
+            # Distinct timezones for open_now, and the ?timezone= filter
+            models.Index(fields=["timezone"], name="store_timezone_idx"),
+            GistIndex(fields=["zoned_open_intervals"], name="store_zoned_open_intervals_gist"),
+            GinIndex(fields=["search_vector"], name="store_search_vector_gin"),
+        ]
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"name", "address"} & set(update_fields):
+            self.search_vector = store_search_vector(self.name, self.address)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_vector"}
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"open_intervals", "timezone"} & set(update_fields):
+            self.zoned_open_intervals = zoned_intervals(self.open_intervals, self.timezone)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "zoned_open_intervals"}
+        super().save(*args, **kwargs)
+
+    def refresh_open_intervals(self):
+        self.open_intervals = open_intervals(self.opening_hours.values_list("weekday", "from_hour", "to_hour"))
+        self.zoned_open_intervals = zoned_intervals(self.open_intervals, self.timezone)
+        Store.objects.filter(pk=self.pk).update(
+            open_intervals=self.open_intervals, zoned_open_intervals=self.zoned_open_intervals
+        )
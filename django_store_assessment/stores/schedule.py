@@ -0,0 +1,121 @@
+"""
+Helpers for the denormalized weekly schedule kept on ``Store.open_intervals``.
+
+A moment in the week is encoded as minutes since Monday 00:00, so the whole
+schedule of a store becomes a set of half-open ``[start, end)`` minute ranges.
+The ranges are in the store's own ``timezone``. Slots closing at or before
+the time they open run overnight into the next day, and Sunday nights wrap
+around to Monday morning, so an overnight slot is a single row rather than
+one per day.
+
+For "open now", ``Store.zoned_open_intervals`` keeps the same ranges moved
+to a band of integers of the store's timezone, so that one GiST index on it
+answers "which stores in this timezone are open at this minute".
+``open_now_q()`` asks that once per timezone the stores are in, each with
+the current minute of the week there.
+"""
+import hashlib
+import re
+import zoneinfo
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+OPEN_AT_RE = re.compile(r"^(?P<weekday>[1-7])T(?P<hour>[01]\d|2[0-3]):(?P<minute>[0-5]\d)$")
+
+
+def minute_of_week(weekday, time):
+    return (weekday - 1) * MINUTES_PER_DAY + time.hour * 60 + time.minute
+
+
+def slot_interval(weekday, from_hour, to_hour):
+    """The minute range of a slot, overnight slots end on the next day (possibly past the end of the week)."""
+    start = minute_of_week(weekday, from_hour)
+    end = minute_of_week(weekday, to_hour)
+    if end <= start:
+        end += MINUTES_PER_DAY
+    return start, end
+
+
+def open_intervals(slots):
+    """Merge ``(weekday, from_hour, to_hour)`` slots into sorted, disjoint minute ranges."""
+    intervals = []
+    for slot in slots:
+        start, end = slot_interval(*slot)
+        if end > MINUTES_PER_WEEK:
+            intervals += [(start, MINUTES_PER_WEEK), (0, end - MINUTES_PER_WEEK)]
+        else:
+            intervals.append((start, end))
+    intervals.sort()
+    merged: list[tuple[int, int]] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def parse_open_at(value):
+    """Turn ``"<weekday>T<HH:MM>"`` (e.g. ``"2T14:30"``) into a minute of the week."""
+    match = OPEN_AT_RE.match(value)
+    if not match:
+        raise ValueError("Expected <weekday>T<HH:MM> with weekday 1 (Monday) to 7 (Sunday)")
+    return (int(match["weekday"]) - 1) * MINUTES_PER_DAY + int(match["hour"]) * 60 + int(match["minute"])
+
+
+def default_timezone():
+    return settings.TIME_ZONE
+
+
+def validate_timezone(value):
+    if value not in zoneinfo.available_timezones():
+        raise ValidationError(f"Unknown timezone: {value}")
+
+
+# Number of integer bands for the timezones, small enough that every band
+# fits in an int4multirange
+ZONE_BANDS = 200003
+
+
+def zone_band(timezone):
+    """The band of a timezone, stable across processes and releases (migration 0008 computes it in SQL)."""
+    return int(hashlib.md5(timezone.encode()).hexdigest()[:7], 16) % ZONE_BANDS
+
+
+def zoned_intervals(intervals, timezone):
+    """``open_intervals()`` ranges moved to the band of their timezone."""
+    start = zone_band(timezone) * MINUTES_PER_WEEK
+    return [(lower + start, upper + start) for lower, upper in intervals]
+
+
+def local_minute_of_week(instant, timezone):
+    local = instant.astimezone(zoneinfo.ZoneInfo(timezone))
+    return minute_of_week(local.isoweekday(), local)
+
+
+def open_now_q(instant, timezones):
+    """
+    Q matching the stores open at ``instant``, for stores in the given timezones.
+
+    Every timezone is one indexed containment check. A band may be shared
+    by a few timezones, so the timezone itself is checked as well.
+    """
+    return reduce(
+        or_,
+        (
+            Q(
+                timezone=timezone,
+                zoned_open_intervals__contains=zone_band(timezone) * MINUTES_PER_WEEK
+                + local_minute_of_week(instant, timezone),
+            )
+            for timezone in timezones
+        ),
+        Q(pk__in=[]),
+    )
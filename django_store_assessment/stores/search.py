@@ -0,0 +1,36 @@
+"""
+Full-text search over store names and addresses.
+
+Each store keeps a precomputed ``search_vector`` (name weighted A, address
+weighted B) behind a GIN index, so a search is one indexed match plus a
+ranking of the matching rows.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import CharField, F, Value
+
+# No stemming or stop words: store names and addresses are proper nouns in many languages
+SEARCH_CONFIG = "simple"
+
+
+def address_text(address):
+    if address is None:
+        return ""
+    return " ".join([address.street, address.city, address.state, address.postal_code, address.country])
+
+
+def store_search_vector(name, address):
+    """Search vector expression for a store, usable in save(), update() and bulk_create()."""
+    if isinstance(name, str):
+        name = Value(name, output_field=CharField())
+    return SearchVector(name, weight="A", config=SEARCH_CONFIG) + SearchVector(
+        Value(address_text(address), output_field=CharField()), weight="B", config=SEARCH_CONFIG
+    )
+
+
+def search_stores(queryset, terms):
+    query = SearchQuery(terms, search_type="websearch", config=SEARCH_CONFIG)
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "id")
+    )
@@ -0,0 +1,60 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from django_store_assessment.stores.cache import invalidate_stores
+from django_store_assessment.stores.managers import slot_cache
+from django_store_assessment.stores.models import Address, OpeningHours, Store
+
+
+def opening_hours_changed(store_ids):
+    store_ids = list(store_ids)
+    for store in Store.objects.filter(pk__in=store_ids):
+        store.refresh_open_intervals()
+    invalidate_stores(store_ids)
+
+
+@receiver(m2m_changed, sender=Store.opening_hours.through)
+def sync_stores_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # The affected stores are gone from the through table after the clear
+        instance._cleared_store_ids = list(instance.stores.values_list("pk", flat=True))
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        instance.refresh_open_intervals()
+        invalidate_stores([instance.pk])
+    elif action == "post_clear":
+        opening_hours_changed(instance.__dict__.pop("_cleared_store_ids", []))
+    else:
+        opening_hours_changed(pk_set)
+
+
+@receiver(post_save, sender=OpeningHours)
+def sync_stores_on_opening_hours_save(sender, instance, created, **kwargs):
+    if not created:
+        # The cache is keyed by the old slot, which we no longer know
+        slot_cache.clear()
+        opening_hours_changed(instance.stores.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=OpeningHours)
+def collect_stores_on_opening_hours_delete(sender, instance, **kwargs):
+    instance._deleted_store_ids = list(instance.stores.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=OpeningHours)
+def sync_stores_on_opening_hours_delete(sender, instance, **kwargs):
+    slot_cache.discard((instance.weekday, instance.from_hour, instance.to_hour))
+    opening_hours_changed(instance.__dict__.pop("_deleted_store_ids", []))
+
+
+@receiver(post_save, sender=Address)
+def invalidate_stores_on_address_save(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_stores(instance.stores.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_store(sender, instance, **kwargs):
+    invalidate_stores([instance.pk])
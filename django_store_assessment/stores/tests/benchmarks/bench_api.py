@@ -0,0 +1,79 @@
+import itertools
+import json
+import os
+
+import pytest
+from django.urls import reverse
+
+from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.tests.benchmarks.utils import (
+    CITIES,
+    bench_sizes,
+    grow_stores,
+    measure,
+    profile,
+    regressions,
+    report,
+    write_results,
+)
+
+ALL_STORES_URL = reverse("store-list")
+SEARCH_STORES_URL = reverse("store-search")
+
+ADDRESS = {
+    "street": "1 Bench St",
+    "city": "Benchton",
+    "state": "BS",
+    "postal_code": "12345",
+    "country": "Benchland",
+}
+
+
+def store_payload(n):
+    return {
+        "name": f"Bench Store {n}",
+        "address": ADDRESS,
+        "opening_hours": [
+            {"weekday": weekday, "from_hour": "09:00", "to_hour": "17:00" if n % 2 else "18:00"}
+            for weekday in range(1, 6)
+        ],
+    }
+
+
+def endpoints(api_client):
+    """One callable per StoreViewSet operation, each issuing a single request."""
+    store_id = Store.objects.order_by("id").values_list("id", flat=True)[Store.objects.count() // 2]
+    detail_url = reverse("store-detail", args=[store_id])
+    counter = itertools.count()
+
+    return {
+        "list": lambda: api_client.get(ALL_STORES_URL),
+        "sparse_list": lambda: api_client.get(ALL_STORES_URL, {"fields": "id,name"}),
+        "filtered_list": lambda: api_client.get(ALL_STORES_URL, {"address__city": CITIES[3]}),
+        "search": lambda: api_client.get(SEARCH_STORES_URL, {"q": CITIES[-1]}),
+        "retrieve": lambda: api_client.get(detail_url),
+        "create": lambda: api_client.post(ALL_STORES_URL, store_payload(next(counter)), format="json"),
+        "update": lambda: api_client.put(detail_url, store_payload(next(counter)), format="json"),
+    }
+
+
+@pytest.mark.django_db
+def test_api_benchmarks(api_client, settings):
+    # Measure the query path, not the response cache
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+    results = []
+    for size in bench_sizes([10_000, 100_000, 1_000_000]):
+        grow_stores(size)
+        for endpoint, request in endpoints(api_client).items():
+            assert request().status_code < 400, endpoint
+            results.append({"stores": size, "endpoint": endpoint, **measure(request), **profile(request)})
+
+    report("StoreViewSet", results)
+    write_results(results)
+
+    baseline = os.environ.get("STORES_BENCH_BASELINE")
+    if baseline:
+        with open(baseline) as f:
+            found = regressions(results, json.load(f))
+        assert not found, "Regressions against the baseline:\n" + "\n".join(found)
@@ -0,0 +1,210 @@
+"""
+Load test of the store read endpoints, ASGI against WSGI.
+
+Both applications are driven in-process by simulated slow clients: every
+response takes ``STORES_BENCH_CLIENT_DELAY_MS`` to reach its client. Under
+WSGI each connection holds a worker until then, and there are only
+``STORES_BENCH_WSGI_WORKERS`` of them (threads here, processes with
+Gunicorn's sync workers) and serves the synchronous views. Under ASGI all
+connections share one event loop and the read actions are coroutines.
+The numbers of concurrent connections come from ``STORES_BENCH_CONNECTIONS``.
+
+Memory per connection is the Python heap at peak divided by the number of
+concurrent connections. It does not include thread stacks, hence the peak
+thread count next to it, nor the whole process a sync worker costs, which
+is reported once as ``rss_mib``.
+"""
+import asyncio
+import io
+import os
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from config.asgi import application as asgi_application
+from config.wsgi import application as wsgi_application
+from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.tests.benchmarks.utils import report
+
+CONNECTIONS = [int(value) for value in os.environ.get("STORES_BENCH_CONNECTIONS", "1,10,50").split(",")]
+CLIENT_DELAY = int(os.environ.get("STORES_BENCH_CLIENT_DELAY_MS", "200")) / 1000
+WSGI_WORKERS = int(os.environ.get("STORES_BENCH_WSGI_WORKERS", "4"))
+REQUESTS_PER_CONNECTION = 10
+WSGI_URLCONF = "django_store_assessment.stores.tests.benchmarks.sync_urls"
+
+
+def wsgi_get(path, authorization):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "testserver",
+        "HTTP_AUTHORIZATION": authorization,
+        "wsgi.input": io.BytesIO(),
+        "wsgi.url_scheme": "http",
+        "wsgi.errors": io.StringIO(),
+    }
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+        return lambda data: None
+
+    body = wsgi_application(environ, start_response)
+    try:
+        b"".join(body)
+        # The worker is stuck writing to the slow client
+        time.sleep(CLIENT_DELAY)
+    finally:
+        body.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_get(path, authorization):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"authorization", authorization.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+        elif not message.get("more_body"):
+            await asyncio.sleep(CLIENT_DELAY)
+
+    await asgi_application(scope, receive, send)
+    return statuses[0]
+
+
+def run_wsgi(paths, authorization, concurrency):
+    async def connection(paths, workers):
+        loop = asyncio.get_running_loop()
+        latencies = []
+        for path in paths:
+            # Includes the time spent waiting for a free worker
+            start = time.perf_counter()
+            assert await loop.run_in_executor(workers, wsgi_get, path, authorization) == 200
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    async def main():
+        # The same paths, without the coroutine views a WSGI server would run through async_to_sync
+        with override_settings(ROOT_URLCONF=WSGI_URLCONF), ThreadPoolExecutor(max_workers=WSGI_WORKERS) as workers:
+            results = await asyncio.gather(
+                *(connection(paths, workers) for paths in paths_per_connection(paths, concurrency))
+            )
+        return [latency for latencies in results for latency in latencies]
+
+    return asyncio.run(main())
+
+
+def run_asgi(paths, authorization, concurrency):
+    async def connection(paths):
+        latencies = []
+        for path in paths:
+            start = time.perf_counter()
+            assert await asgi_get(path, authorization) == 200
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    async def main():
+        results = await asyncio.gather(*(connection(paths) for paths in paths_per_connection(paths, concurrency)))
+        return [latency for latencies in results for latency in latencies]
+
+    return asyncio.run(main())
+
+
+def paths_per_connection(paths, concurrency):
+    return [paths[i::concurrency] for i in range(concurrency)]
+
+
+def load(run, paths, authorization, concurrency):
+    peak_threads = threading.active_count()
+
+    def watch_threads():
+        nonlocal peak_threads
+        while not done.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.005)
+
+    done = threading.Event()
+    watcher = threading.Thread(target=watch_threads)
+    watcher.start()
+    start = time.perf_counter()
+    try:
+        latencies = sorted(run(paths, authorization, concurrency))
+        elapsed = time.perf_counter() - start
+    finally:
+        done.set()
+        watcher.join()
+
+    # A second pass for memory, tracemalloc slows everything down
+    tracemalloc.start()
+    try:
+        run(paths, authorization, concurrency)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "kib_per_conn": peak / 1024 / concurrency,
+        # Less the watcher
+        "threads": peak_threads - 1,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_against_wsgi(user, seed_stores, settings):
+    # Measure the query path, not the response cache
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    seed_stores(1000)
+    authorization = f"Token {Token.objects.create(user=user).key}"
+    store_ids = list(Store.objects.order_by("?").values_list("id", flat=True)[:50])
+
+    results = []
+    for concurrency in CONNECTIONS:
+        requests = concurrency * REQUESTS_PER_CONNECTION
+        paths = [
+            reverse("store-list") if i % 2 else reverse("store-detail", args=[store_ids[i % len(store_ids)]])
+            for i in range(requests)
+        ]
+        for server, run in (("wsgi", run_wsgi), ("asgi", run_asgi)):
+            results.append(
+                {"server": server, "connections": concurrency, **load(run, paths, authorization, concurrency)}
+            )
+        # Worker threads are gone, make sure their connections are too
+        connections.close_all()
+
+    report(
+        f"GET list/retrieve, {CLIENT_DELAY * 1000:.0f}ms per response on the client side, "
+        f"{WSGI_WORKERS} WSGI workers, rss_mib={resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}",
+        results,
+    )
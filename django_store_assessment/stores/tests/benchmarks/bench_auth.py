@@ -0,0 +1,26 @@
+import pytest
+from django.urls import reverse
+from rest_framework.authentication import TokenAuthentication
+
+from django_store_assessment.stores.api.views import StoreViewSet
+from django_store_assessment.stores.tests.benchmarks.utils import measure, profile, report
+from django_store_assessment.users.authentication import CachedTokenAuthentication
+
+ALL_STORES_URL = reverse("store-list")
+
+
+@pytest.mark.django_db
+def test_token_authentication_cost(api_client, monkeypatch, seed_stores):
+    seed_stores(1000)
+
+    def request():
+        # Served from the response cache, so what remains is mostly authentication
+        return api_client.get(ALL_STORES_URL)
+
+    rows = []
+    for authentication in (TokenAuthentication, CachedTokenAuthentication):
+        monkeypatch.setattr(StoreViewSet, "authentication_classes", [authentication])
+        request()
+        rows.append({"authentication": authentication.__name__, **measure(request, rounds=200), **profile(request)})
+
+    report("GET /api/stores/ from the response cache", rows)
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+from django.urls import reverse
+
+from django_store_assessment.stores.api.views import StoreViewSet
+from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.tests.benchmarks.utils import bench_sizes, report
+
+ALL_STORES_URL = reverse("store-list")
+BULK_STORES_URL = reverse("store-bulk")
+
+
+def store_payload(i):
+    return {
+        "name": f"Bench Store {i}",
+        "address": {
+            "street": f"{i} Bench St",
+            "city": "Bench City",
+            "state": "BS",
+            "postal_code": "00000",
+            "country": "Benchland",
+        },
+        "opening_hours": [{"weekday": weekday, "from_hour": "09:00", "to_hour": "17:00"} for weekday in range(1, 6)],
+    }
+
+
+@pytest.mark.django_db
+def test_bulk_create_throughput(api_client):
+    rows = []
+    for size in bench_sizes([500, 2000]):
+        payload = [store_payload(i) for i in range(size)]
+
+        start = time.perf_counter()
+        for item in payload:
+            api_client.post(ALL_STORES_URL, item, format="json")
+        single = time.perf_counter() - start
+        Store.objects.all().delete()
+
+        start = time.perf_counter()
+        for offset in range(0, size, StoreViewSet.bulk_max_items):
+            batch = payload[offset : offset + StoreViewSet.bulk_max_items]
+            assert api_client.post(BULK_STORES_URL, batch, format="json").status_code == 201
+        bulk = time.perf_counter() - start
+        assert Store.objects.count() == size
+        Store.objects.all().delete()
+
+        rows.append({"stores": size, "single_stores_per_s": size / single, "bulk_stores_per_s": size / bulk})
+
+    report("POST /api/stores/ vs POST /api/stores/bulk/", rows)
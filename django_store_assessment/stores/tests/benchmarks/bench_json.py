@@ -0,0 +1,57 @@
+import io
+import time
+
+import pytest
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from django_store_assessment.stores.api.serializers import StoreSerializer
+from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.tests.benchmarks.utils import bench_sizes, report
+from django_store_assessment.utils.fastjson import FastJSONParser, FastJSONRenderer
+
+
+def cpu_per_call(func, min_seconds=1.0):
+    """Call ``func`` for at least ``min_seconds`` of CPU time and return the CPU seconds per call."""
+    calls = 0
+    start = time.process_time()
+    while (elapsed := time.process_time() - start) < min_seconds:
+        func()
+        calls += 1
+    return elapsed / calls
+
+
+@pytest.mark.django_db
+def test_json_rendering_and_parsing(seed_stores):
+    seed_stores(max(bench_sizes([10, 100, 1000])), seed=0)
+
+    rows = []
+    for size in bench_sizes([10, 100, 1000]):
+        # What a page of StoreViewSet.list() hands to the renderer
+        stores = StoreSerializer.setup_eager_loading(Store.objects.order_by("id"))[:size]
+        data = {"count": size, "next": None, "previous": None, "results": StoreSerializer(stores, many=True).data}
+
+        body = JSONRenderer().render(data)
+        assert FastJSONRenderer().render(data) == body
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            cpu = cpu_per_call(lambda: renderer.render(data))
+            rows.append(
+                {
+                    "stores": size,
+                    "operation": f"render/{type(renderer).__name__}",
+                    "cpu_us": cpu * 1e6,
+                    "mib_per_s": len(body) / cpu / 2**20,
+                }
+            )
+        for parser in (JSONParser(), FastJSONParser()):
+            cpu = cpu_per_call(lambda: parser.parse(io.BytesIO(body), "application/json", {}))
+            rows.append(
+                {
+                    "stores": size,
+                    "operation": f"parse/{type(parser).__name__}",
+                    "cpu_us": cpu * 1e6,
+                    "mib_per_s": len(body) / cpu / 2**20,
+                }
+            )
+
+    report("JSON rendering and parsing of StoreViewSet list pages", rows)
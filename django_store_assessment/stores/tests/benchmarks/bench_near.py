@@ -0,0 +1,47 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from django_store_assessment.stores.models import Address, Store
+from django_store_assessment.stores.tests.benchmarks.utils import bench_sizes, measure, report
+
+ALL_STORES_URL = reverse("store-list")
+
+
+@pytest.mark.django_db
+def test_near_latency(api_client, seed_stores, settings):
+    # Measure the query path, not the response cache
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+    rows = []
+    for size in bench_sizes([10_000, 100_000, 1_000_000]):
+        seed_stores(size - Store.objects.count(), seed=size)
+        with connection.cursor() as cursor:
+            for model in (Address, Store):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+        # Around an existing store, so that there is something to find
+        latitude, longitude = Address.objects.values_list("latitude", "longitude").order_by("id")[0]
+        params = {"near": f"{latitude},{longitude}", "radius": "25"}
+        matches = api_client.get(ALL_STORES_URL, params).data["count"]
+
+        indexed = measure(lambda: api_client.get(ALL_STORES_URL, params), rounds=10)
+        # What the same search costs without the location index
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_indexscan = off")
+            cursor.execute("SET enable_bitmapscan = off")
+            try:
+                scan = measure(lambda: api_client.get(ALL_STORES_URL, params), rounds=3)
+            finally:
+                cursor.execute("RESET enable_indexscan")
+                cursor.execute("RESET enable_bitmapscan")
+        rows.append(
+            {
+                "stores": size,
+                "matches": matches,
+                "indexed_p50_ms": indexed["p50_ms"],
+                "indexed_p95_ms": indexed["p95_ms"],
+                "full_scan_p50_ms": scan["p50_ms"],
+            }
+        )
+
+    report("?near=<lat>,<lng>&radius=25 with and without the location index", rows)
@@ -0,0 +1,44 @@
+import pytest
+from django.urls import reverse
+from rest_framework.pagination import Cursor
+
+from django_store_assessment.stores.api.pagination import StoreCursorPagination
+from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.tests.benchmarks.utils import bench_sizes, grow_stores, measure, report
+
+ALL_STORES_URL = reverse("store-list")
+PAGE = 1000
+
+
+def cursor_url_for_page(page):
+    # Build the cursor a client would hold after walking to ``page``
+    paginator = StoreCursorPagination()
+    paginator.base_url = f"http://testserver{ALL_STORES_URL}?pagination=cursor"
+    position = Store.objects.order_by("id").values_list("id", flat=True)[(page - 1) * paginator.page_size - 1]
+    return paginator.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+
+@pytest.mark.django_db
+def test_deep_page_latency(api_client, settings):
+    # Measure the query path, not the response cache
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+    rows = []
+    for size in bench_sizes([20_000, 100_000, 200_000]):
+        grow_stores(size)
+        cursor_url = cursor_url_for_page(PAGE)
+
+        offset = measure(lambda: api_client.get(ALL_STORES_URL, {"page": PAGE}))
+        cursor = measure(lambda: api_client.get(cursor_url))
+        rows.append(
+            {
+                "stores": size,
+                "page_number_p50_ms": offset["p50_ms"],
+                "page_number_p95_ms": offset["p95_ms"],
+                "cursor_p50_ms": cursor["p50_ms"],
+                "cursor_p95_ms": cursor["p95_ms"],
+            }
+        )
+
+    report(f"GET /api/stores/ page {PAGE}", rows)
+    assert api_client.get(cursor_url_for_page(PAGE)).status_code == 200
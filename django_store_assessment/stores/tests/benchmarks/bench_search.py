@@ -0,0 +1,31 @@
+import pytest
+from django.urls import reverse
+
+from django_store_assessment.stores.tests.benchmarks.utils import CITIES, bench_sizes, grow_stores, measure, report
+
+ALL_STORES_URL = reverse("store-list")
+SEARCH_STORES_URL = reverse("store-search")
+
+
+@pytest.mark.django_db
+def test_search_latency(api_client, settings):
+    # Measure the query path, not the response cache
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    term = CITIES[-1]
+
+    rows = []
+    for size in bench_sizes([100_000, 1_000_000]):
+        grow_stores(size)
+        search_filter = measure(lambda: api_client.get(ALL_STORES_URL, {"search": term}), rounds=10)
+        full_text = measure(lambda: api_client.get(SEARCH_STORES_URL, {"q": term}), rounds=10)
+        rows.append(
+            {
+                "stores": size,
+                "search_filter_p50_ms": search_filter["p50_ms"],
+                "search_filter_p95_ms": search_filter["p95_ms"],
+                "full_text_p50_ms": full_text["p50_ms"],
+                "full_text_p95_ms": full_text["p95_ms"],
+            }
+        )
+
+    report(f"?search={term} vs search/?q={term}", rows)
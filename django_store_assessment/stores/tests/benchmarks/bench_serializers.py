@@ -0,0 +1,42 @@
+import time
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from django_store_assessment.stores.api.serializers import StoreRowSerializer, StoreSerializer
+from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.tests.benchmarks.utils import bench_sizes, report
+
+
+def per_call(func, min_seconds=1.0):
+    """Call ``func`` for at least ``min_seconds`` and return the seconds per call."""
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_seconds:
+        func()
+        calls += 1
+    return elapsed / calls
+
+
+@pytest.mark.django_db
+def test_row_serializer_against_store_serializer(seed_stores):
+    seed_stores(max(bench_sizes([10, 100, 1000])), seed=0)
+    stores = Store.objects.order_by("id")
+
+    def serialize(serializer_class, queryset):
+        return serializer_class(queryset, many=True).data
+
+    serializers = {
+        "StoreSerializer": lambda size: serialize(StoreSerializer, StoreSerializer.setup_eager_loading(stores)[:size]),
+        "StoreRowSerializer": lambda size: serialize(StoreRowSerializer, StoreRowSerializer.setup_rows(stores)[:size]),
+    }
+    rows = []
+    for size in bench_sizes([10, 100, 1000]):
+        rendered = {name: JSONRenderer().render(page(size)) for name, page in serializers.items()}
+        assert rendered["StoreRowSerializer"] == rendered["StoreSerializer"]
+        for name, page in serializers.items():
+            # Queries included, that is what a list page or export chunk costs
+            seconds = per_call(lambda: page(size))
+            rows.append({"stores": size, "serializer": name, "ms": seconds * 1000, "objects_per_s": size / seconds})
+
+    report("Serializing a page of stores from the database", rows)
@@ -0,0 +1,22 @@
+"""
+The store API with every action served by the regular, synchronous views.
+
+Under WSGI a coroutine view runs through async_to_sync, which is not what a
+WSGI deployment would serve, see bench_asgi.py.
+"""
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from django_store_assessment.stores.api.views import StoreViewSet
+
+
+class SyncStoreViewSet(StoreViewSet):
+    async_actions = ()
+
+
+router = DefaultRouter()
+router.register(r"stores", SyncStoreViewSet)
+
+urlpatterns = [
+    path("api/", include(router.urls)),
+]
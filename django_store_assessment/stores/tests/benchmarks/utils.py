@@ -0,0 +1,148 @@
+"""
+Helpers shared by the store API benchmarks.
+
+Benchmark modules are named ``bench_*.py`` so the regular test run does not
+collect them. Run one explicitly against a Postgres database, e.g.::
+
+    pytest django_store_assessment/stores/tests/benchmarks/bench_pagination.py -s
+
+Dataset sizes can be overridden with ``STORES_BENCH_SIZES=10000,100000``.
+Benchmarks that produce JSON results write them to ``STORES_BENCH_OUTPUT``
+and, when ``STORES_BENCH_BASELINE`` names an earlier results file, fail on
+regressions beyond ``STORES_BENCH_TOLERANCE`` (a fraction, 0.25 by default).
+"""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from django_store_assessment.stores.copy import copy_rows
+from django_store_assessment.stores.models import Address, Store
+from django_store_assessment.stores.schedule import default_timezone, zoned_intervals
+from django_store_assessment.stores.search import store_search_vector
+from django_store_assessment.stores.tests.seeding import schedule_slots
+
+
+def bench_sizes(default):
+    value = os.environ.get("STORES_BENCH_SIZES")
+    if not value:
+        return default
+    return [int(size) for size in value.split(",")]
+
+
+def measure(func, rounds=20, warmup=2):
+    """Call ``func`` repeatedly and return its p50/p95 latency in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def profile(func):
+    """Call ``func`` once and return the queries it ran and the memory it allocated at peak."""
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"queries": len(queries), "alloc_peak_kib": peak / 1024}
+
+
+WORDS = ["Corner", "Market", "Fresh", "Urban", "Golden", "Harbor", "Maple", "Summit", "River", "Sunset"]
+CITIES = [f"{word}{suffix}" for word in WORDS for suffix in ("ton", "ville", "field", "burg", "wood")]
+
+
+def grow_stores(target, batch_size=5000):
+    """Add stores (each with its own address and one of the weekly schedules) until ``target`` exist."""
+    existing = Store.objects.count()
+    schedules = schedule_slots()
+    while existing < target:
+        size = min(batch_size, target - existing)
+        addresses = Address.objects.bulk_create(
+            Address(
+                street=f"{i} {WORDS[i % len(WORDS)]} St",
+                city=CITIES[i % len(CITIES)],
+                state="BS",
+                postal_code=f"{i % 100000:05}",
+                country="Benchland",
+            )
+            for i in range(existing, existing + size)
+        )
+        stores = Store.objects.bulk_create(
+            Store(
+                name=name,
+                address=address,
+                open_intervals=schedules[i % len(schedules)][1],
+                zoned_open_intervals=zoned_intervals(schedules[i % len(schedules)][1], default_timezone()),
+                search_vector=store_search_vector(name, address),
+            )
+            for i, name, address in (
+                (i, f"{WORDS[i % 7]} Store {i}", address) for i, address in enumerate(addresses, existing)
+            )
+        )
+        copy_rows(
+            Store.opening_hours.through,
+            ["store_id", "openinghours_id"],
+            ((store.pk, pk) for i, store in enumerate(stores, existing) for pk in schedules[i % len(schedules)][0]),
+        )
+        existing += size
+
+
+def report(title, rows):
+    print(f"\n{title}")
+    for row in rows:
+        print(
+            "  "
+            + "  ".join(
+                f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in row.items()
+            )
+        )
+
+
+def write_results(results, path=None):
+    path = path or os.environ.get("STORES_BENCH_OUTPUT", "stores-bench.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {path}")
+
+
+def regressions(results, baseline, tolerance=None):
+    """
+    Compare two results files row by row and describe every metric that got worse.
+
+    Rows are matched on their non-metric keys (``stores``, ``endpoint``).
+    Latency and allocations may grow by ``tolerance``, query counts not at all.
+    """
+    if tolerance is None:
+        tolerance = float(os.environ.get("STORES_BENCH_TOLERANCE", "0.25"))
+
+    def key(row):
+        return row["stores"], row["endpoint"]
+
+    baseline_rows = {key(row): row for row in baseline}
+    found = []
+    for row in results:
+        previous = baseline_rows.get(key(row))
+        if previous is None:
+            continue
+        for metric, value in row.items():
+            if metric in ("stores", "endpoint") or metric not in previous:
+                continue
+            allowed = previous[metric] if metric == "queries" else previous[metric] * (1 + tolerance)
+            if value > allowed:
+                found.append(f"{row['endpoint']} @ {row['stores']} stores: {metric} {previous[metric]:g} -> {value:g}")
+    return found
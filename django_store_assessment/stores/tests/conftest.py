@@ -0,0 +1,18 @@
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from django_store_assessment.stores.tests import seeding
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=user).key)
+    return client
+
+
+@pytest.fixture
+def seed_stores(db):
+    """Bulk-create realistic stores, e.g. ``seed_stores(10_000)``, see seeding.py."""
+    return seeding.seed_stores
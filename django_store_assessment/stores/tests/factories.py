@@ -16,12 +16,14 @@ class AddressFactory(factory.django.DjangoModelFactory):
     city = factory.LazyAttribute(lambda x: faker.city())
     state = factory.LazyAttribute(lambda x: faker.state())
     postal_code = factory.LazyAttribute(lambda x: faker.postcode())
-    country = factory.LazyAttribute(lambda x: faker.country())
+    # Some Faker country names are longer than the column
+    country = factory.LazyAttribute(lambda x: faker.country()[: Address._meta.get_field("country").max_length])
 
 
 class OpeningHoursFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = OpeningHours
+        django_get_or_create = ("weekday", "from_hour", "to_hour")
 
     weekday = factory.LazyAttribute(lambda x: faker.random_int(min=1, max=7))
     from_hour = datetime.time(9, 0)
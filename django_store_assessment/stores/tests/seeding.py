@@ -0,0 +1,136 @@
+"""
+Fast bulk seeding of realistic store data for benchmarks and load tests.
+
+The factories write one row per INSERT and call Faker for every attribute.
+``seed_stores()`` draws attributes from value pools that Faker fills once,
+shares a handful of weekly schedules (and so opening-hours slots) between
+all stores and writes whole batches with COPY. Addresses are scattered
+around a pool of city centres, a few kilometres apart.
+"""
+import datetime
+import random
+
+from django.db import transaction
+from faker import Faker
+
+from django_store_assessment.stores.cache import invalidate_stores
+from django_store_assessment.stores.copy import allocate_ids, copy_rows
+from django_store_assessment.stores.models import Address, OpeningHours, Store
+from django_store_assessment.stores.schedule import open_intervals
+
+POOL_SIZE = 1000
+# Distance of addresses from their city centre, in degrees
+CITY_SPREAD = 0.1
+TIMEZONES = ["Europe/Berlin", "Europe/London", "America/New_York", "America/Los_Angeles", "Asia/Tokyo"]
+
+# (weekdays, from hour, to hour) blocks making up each weekly schedule
+SCHEDULES: list[list[tuple[range, int, int]]] = [
+    [(range(1, 6), 9, 17)],
+    [(range(1, 7), 8, 20)],
+    [(range(1, 8), 7, 22)],
+    [(range(1, 6), 9, 12), (range(1, 6), 13, 18)],
+    [(range(1, 6), 10, 19), (range(6, 7), 10, 14)],
+    # Overnight, Sunday's closes on Monday morning
+    [(range(1, 8), 18, 2)],
+    [],
+]
+
+
+def faker_pools(faker, size=POOL_SIZE):
+    """Column values generated once up front, truncated to the model's max_length."""
+
+    def pool(model, field, generate):
+        max_length = model._meta.get_field(field).max_length
+        return [generate()[:max_length] for _ in range(size)]
+
+    return {
+        "name": pool(Store, "name", faker.company),
+        "street": pool(Address, "street", faker.street_address),
+        "city": pool(Address, "city", faker.city),
+        "state": pool(Address, "state", faker.state),
+        "postal_code": pool(Address, "postal_code", faker.postcode),
+        "country": pool(Address, "country", faker.country),
+    }
+
+
+def schedule_slots():
+    """``(OpeningHours pks, open intervals)`` of every schedule in SCHEDULES."""
+    keys = [
+        [
+            (weekday, datetime.time(from_hour), datetime.time(to_hour))
+            for weekdays, from_hour, to_hour in blocks
+            for weekday in weekdays
+        ]
+        for blocks in SCHEDULES
+    ]
+    opening_hours = OpeningHours.objects.resolve(slot for schedule in keys for slot in schedule)
+    return [([opening_hours[slot].pk for slot in schedule], open_intervals(schedule)) for schedule in keys]
+
+
+def seed_stores(count, batch_size=10_000, seed=None):
+    """
+    Create ``count`` stores, each with its own address and one of the shared schedules.
+
+    Pass ``seed`` for a reproducible dataset. Returns the pks of the new stores.
+    """
+    rng = random.Random(seed)
+    # A generator of its own, the other columns stay what they were for a seed
+    location_rng = random.Random(seed)
+    centres = [(location_rng.uniform(-55, 70), location_rng.uniform(-180, 180)) for _ in range(POOL_SIZE)]
+    faker = Faker()
+    faker.seed_instance(seed)
+    pools = faker_pools(faker)
+    schedules = schedule_slots()
+
+    store_ids = []
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        with transaction.atomic():
+            address_ids = allocate_ids(Address, size)
+            batch_ids = allocate_ids(Store, size)
+            columns = {field: rng.choices(values, k=size) for field, values in pools.items()}
+            picks = rng.choices(schedules, k=size)
+            locations = [
+                (
+                    latitude + location_rng.uniform(-CITY_SPREAD, CITY_SPREAD),
+                    (longitude + location_rng.uniform(-CITY_SPREAD, CITY_SPREAD) + 180) % 360 - 180,
+                )
+                for latitude, longitude in location_rng.choices(centres, k=size)
+            ]
+
+            copy_rows(
+                Address,
+                ["id", "street", "city", "state", "postal_code", "country", "latitude", "longitude"],
+                (
+                    (address_id, street, city, state, postal_code, country, latitude, longitude)
+                    for address_id, street, city, state, postal_code, country, (latitude, longitude) in zip(
+                        address_ids,
+                        columns["street"],
+                        columns["city"],
+                        columns["state"],
+                        columns["postal_code"],
+                        columns["country"],
+                        locations,
+                    )
+                ),
+            )
+            Store.objects.bulk_insert(
+                list(
+                    zip(
+                        batch_ids,
+                        columns["name"],
+                        address_ids,
+                        (intervals for _, intervals in picks),
+                        location_rng.choices(TIMEZONES, k=size),
+                    )
+                )
+            )
+            copy_rows(
+                Store.opening_hours.through,
+                ["store_id", "openinghours_id"],
+                ((store_id, pk) for store_id, (slot_ids, _) in zip(batch_ids, picks) for pk in slot_ids),
+            )
+        store_ids.extend(batch_ids)
+
+    invalidate_stores()
+    return store_ids
@@ -0,0 +1,68 @@
+import pytest
+from django.urls import reverse
+
+from django_store_assessment.stores.models import OpeningHours
+from django_store_assessment.stores.tests.factories import OpeningHoursFactory, StoreFactory
+
+STORE_CHANGELIST_URL = reverse("admin:stores_store_changelist")
+
+
+def store_open_on(*weekdays, **kwargs):
+    store = StoreFactory.create(**kwargs)
+    store.opening_hours.add(*(OpeningHoursFactory.create(weekday=weekday) for weekday in weekdays))
+    return store
+
+
+@pytest.mark.django_db
+class TestStoreAdmin:
+    def test_changelist_query_count_is_constant(self, admin_client, django_assert_num_queries):
+        for _ in range(2):
+            store_open_on(1, 2)
+        admin_client.get(STORE_CHANGELIST_URL)
+
+        with django_assert_num_queries(7) as captured:
+            response = admin_client.get(STORE_CHANGELIST_URL)
+        assert response.status_code == 200
+
+        for _ in range(10):
+            store_open_on(1, 2, 3)
+        with django_assert_num_queries(len(captured)):
+            admin_client.get(STORE_CHANGELIST_URL)
+
+    def test_days_open_counts_distinct_weekdays(self, admin_client):
+        store = store_open_on(1, 2, 3, name="Three Days")
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1, from_hour="18:00", to_hour="22:00"))
+
+        response = admin_client.get(STORE_CHANGELIST_URL)
+
+        assert response.context["cl"].result_list.get(pk=store.pk).days_open_count == 3
+
+    def test_sort_and_filter_by_days_open(self, admin_client):
+        one = store_open_on(1)
+        three = store_open_on(1, 2, 3)
+        two = store_open_on(1, 2)
+
+        response = admin_client.get(STORE_CHANGELIST_URL, {"o": "-3"})
+        assert list(response.context["cl"].result_list) == [three, two, one]
+
+        response = admin_client.get(STORE_CHANGELIST_URL, {"days_open": "2"})
+        assert list(response.context["cl"].result_list) == [two]
+
+
+@pytest.mark.django_db
+class TestOpeningHoursAdmin:
+    def test_slots_cannot_be_edited(self, admin_client):
+        slot = OpeningHoursFactory.create(weekday=1, from_hour="09:00", to_hour="17:00")
+        url = reverse("admin:stores_openinghours_change", args=[slot.pk])
+
+        admin_client.post(url, {"weekday": 2, "from_hour": "10:00", "to_hour": "18:00"})
+
+        slot.refresh_from_db()
+        assert (slot.weekday, slot.from_hour.hour, slot.to_hour.hour) == (1, 9, 17)
+
+    def test_slots_can_be_added(self, admin_client):
+        admin_client.post(
+            reverse("admin:stores_openinghours_add"), {"weekday": 2, "from_hour": "10:00", "to_hour": "18:00"}
+        )
+
+        assert OpeningHours.objects.filter(weekday=2).exists()
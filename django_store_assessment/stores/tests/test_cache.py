@@ -0,0 +1,92 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from django_store_assessment.stores.tests.factories import OpeningHoursFactory, StoreFactory
+
+ALL_STORES_URL = reverse("store-list")
+
+
+@pytest.mark.django_db
+class TestStoreResponseCache:
+    def test_list_is_served_from_cache(self, api_client, django_assert_num_queries):
+        StoreFactory.create_batch(3)
+        first = api_client.get(ALL_STORES_URL)
+
+        # the token is cached too and reads run outside a transaction
+        with django_assert_num_queries(0):
+            second = api_client.get(ALL_STORES_URL)
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+        assert second["ETag"] == first["ETag"]
+
+    def test_query_params_are_normalized(self, api_client):
+        StoreFactory.create_batch(3)
+
+        first = api_client.get(f"{ALL_STORES_URL}?name=a&page=1")
+        second = api_client.get(f"{ALL_STORES_URL}?page=1&name=a")
+        other_filter = api_client.get(f"{ALL_STORES_URL}?name=b&page=1")
+
+        assert first["ETag"] == second["ETag"]
+        assert other_filter["ETag"] != first["ETag"]
+
+    def test_unchanged_resource_returns_not_modified(self, api_client, django_assert_num_queries):
+        store = StoreFactory.create()
+        url = reverse("store-detail", args=[store.id])
+        etag = api_client.get(url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_update_invalidates_list_and_detail(self, api_client):
+        store = StoreFactory.create(name="Original Name")
+        url = reverse("store-detail", args=[store.id])
+        list_etag = api_client.get(ALL_STORES_URL)["ETag"]
+        detail_etag = api_client.get(url)["ETag"]
+
+        api_client.patch(url, {"name": "Updated Name"}, format="json")
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["name"] == "Updated Name"
+        response = api_client.get(ALL_STORES_URL, HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0]["name"] == "Updated Name"
+
+    def test_other_stores_keep_their_cached_detail(self, api_client):
+        store, other = StoreFactory.create_batch(2)
+        other_url = reverse("store-detail", args=[other.id])
+        etag = api_client.get(other_url)["ETag"]
+
+        store.name = "Updated Name"
+        store.save()
+
+        assert api_client.get(other_url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_address_and_opening_hours_changes_invalidate(self, api_client):
+        store = StoreFactory.create()
+        url = reverse("store-detail", args=[store.id])
+
+        etag = api_client.get(url)["ETag"]
+        store.address.street = "1 New Street"
+        store.address.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.data["address"]["street"] == "1 New Street"
+
+        etag = response["ETag"]
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1))
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert len(response.data["opening_hours"]) == 1
+
+    def test_bulk_create_invalidates_list(self, api_client):
+        etag = api_client.get(ALL_STORES_URL)["ETag"]
+
+        api_client.post(reverse("store-bulk"), [{"name": "Example Store"}], format="json")
+
+        response = api_client.get(ALL_STORES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
@@ -0,0 +1,184 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from django_store_assessment.stores.geocoding import OfflineGeocoder
+from django_store_assessment.stores.models import Address, OpeningHours, Store
+from django_store_assessment.stores.schedule import open_intervals
+from django_store_assessment.stores.search import search_stores
+from django_store_assessment.stores.tests.factories import AddressFactory
+
+
+@pytest.fixture
+def seeded_stores(seed_stores):
+    return seed_stores(2000, seed=0)
+
+
+@pytest.mark.django_db
+class TestExplainFilters:
+    def test_every_filter_is_indexed(self, seeded_stores, capsys):
+        call_command("explain_filters")
+
+        output = capsys.readouterr().out
+        assert "name=" in output
+        assert "open_at=" in output
+        assert "full scan" not in output
+
+    def test_missing_index_fails(self, seeded_stores):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX store_name_idx")
+
+        with pytest.raises(CommandError, match="name"):
+            call_command("explain_filters")
+
+    def test_empty_database_fails(self):
+        with pytest.raises(CommandError, match="seed"):
+            call_command("explain_filters")
+
+
+@pytest.mark.django_db
+class TestImportStores:
+    def test_import_ndjson(self, tmp_path, capsys):
+        path = tmp_path / "stores.ndjson"
+        rows = [
+            {
+                "name": "Springfield Grocery",
+                "address": {
+                    "street": "1 Main St",
+                    "city": "Springfield",
+                    "state": "EX",
+                    "postal_code": "12345",
+                    "country": "Exampleland",
+                },
+                "opening_hours": [
+                    {"weekday": 1, "from_hour": "08:00", "to_hour": "12:00"},
+                    {"weekday": 1, "from_hour": "12:00", "to_hour": "17:00"},
+                ],
+            },
+            {"id": 42, "name": "No Address", "address": None, "opening_hours": []},
+        ]
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        call_command("import_stores", str(path))
+
+        assert "Imported 2 stores" in capsys.readouterr().out
+        store = Store.objects.get(name="Springfield Grocery")
+        address = store.address
+        assert address is not None and address.city == "Springfield"
+        assert (address.latitude, address.longitude) == OfflineGeocoder().geocode(address)
+        assert store.opening_hours.count() == 2
+        assert store.open_intervals == [(8 * 60, 17 * 60)]
+        assert list(search_stores(Store.objects.all(), "springfield")) == [store]
+        assert Store.objects.get(name="No Address").address is None
+
+    def test_import_csv_skips_invalid_rows(self, tmp_path, capsys):
+        path = tmp_path / "stores.csv"
+        path.write_text(
+            "id,name,street,city,state,postal_code,country,opening_hours\n"
+            '1,Valid,1 Main St,Springfield,EX,12345,Exampleland,"[{""weekday"":2,""from_hour"":""09:00"",'
+            '""to_hour"":""17:00""}]"\n'
+            '2,Closed Hours,,,,,,"[{""weekday"":2,""from_hour"":""17:00"",""to_hour"":""17:00""}]"\n'
+            "3,,,,,,,\n"
+        )
+
+        call_command("import_stores", str(path))
+
+        output = capsys.readouterr()
+        assert "Imported 1 stores" in output.out
+        assert "skipped 2 invalid rows" in output.out
+        assert "Line 3:" in output.err
+        assert "Line 4:" in output.err
+        store = Store.objects.get()
+        assert store.address is not None and store.address.postal_code == "12345"
+        assert store.open_intervals == [(24 * 60 + 9 * 60, 24 * 60 + 17 * 60)]
+
+    def test_import_copies_rows_in_batches(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("django_store_assessment.stores.copy.COPY_MIN_ROWS", 1)
+        path = tmp_path / "stores.ndjson"
+        path.write_text(
+            "".join(
+                json.dumps(
+                    {
+                        "name": f"Store {i}",
+                        "address": {
+                            "street": f"{i} Main St",
+                            "city": "Springfield",
+                            "state": "EX",
+                            "postal_code": "12345",
+                            "country": "Exampleland",
+                        },
+                        "opening_hours": [
+                            {"weekday": weekday, "from_hour": "09:00", "to_hour": "17:00"} for weekday in (1, 2, 3)
+                        ],
+                    }
+                )
+                + "\n"
+                for i in range(5)
+            )
+        )
+
+        call_command("import_stores", str(path), batch_size=2)
+
+        assert Store.objects.count() == 5
+        assert Store.opening_hours.through.objects.count() == 15
+        assert OpeningHours.objects.count() == 3
+        store = Store.objects.get(name="Store 4")
+        assert store.address is not None and store.address.street == "4 Main St"
+        assert store.open_intervals == [(9 * 60, 17 * 60), (33 * 60, 41 * 60), (57 * 60, 65 * 60)]
+        assert list(search_stores(Store.objects.all(), '"4 main"')) == [store]
+
+    def test_unknown_format_fails(self, tmp_path):
+        path = tmp_path / "stores.xml"
+        path.write_text("")
+
+        with pytest.raises(CommandError, match="--format"):
+            call_command("import_stores", str(path))
+
+
+@pytest.mark.django_db
+class TestGeocodeAddresses:
+    def test_geocode_addresses(self, settings, capsys):
+        settings.STORES_GEOCODER = ""
+        AddressFactory.create_batch(3)
+        located = AddressFactory.create(latitude=1.5, longitude=2.5)
+        settings.STORES_GEOCODER = "django_store_assessment.stores.geocoding.OfflineGeocoder"
+
+        call_command("geocode_addresses", batch_size=2)
+
+        assert "Located 3 of 3 addresses" in capsys.readouterr().out
+        for address in Address.objects.exclude(pk=located.pk):
+            assert (address.latitude, address.longitude) == OfflineGeocoder().geocode(address)
+        located.refresh_from_db()
+        assert (located.latitude, located.longitude) == (1.5, 2.5)
+
+    def test_without_a_geocoder_fails(self, settings):
+        settings.STORES_GEOCODER = ""
+
+        with pytest.raises(CommandError, match="STORES_GEOCODER"):
+            call_command("geocode_addresses")
+
+
+@pytest.mark.django_db
+class TestSeedStores:
+    def test_seed_stores(self, capsys):
+        call_command("seed_stores", 25, batch_size=10, seed=1)
+
+        assert "Seeded 25 stores" in capsys.readouterr().out
+        assert Store.objects.count() == 25
+        assert Address.objects.count() == 25
+        for store in Store.objects.select_related("address").prefetch_related("opening_hours"):
+            slots = [(oh.weekday, oh.from_hour, oh.to_hour) for oh in store.opening_hours.all()]
+            assert store.open_intervals == open_intervals(slots)
+            assert store.address is not None
+            assert list(search_stores(Store.objects.filter(pk=store.pk), store.address.city)) == [store]
+
+    def test_seed_is_reproducible(self, seed_stores):
+        seed_stores(10, seed=3)
+        first = list(Store.objects.order_by("id").values_list("name", "address__street", "open_intervals"))
+        Store.objects.all().delete()
+
+        seed_stores(10, seed=3)
+
+        assert list(Store.objects.order_by("id").values_list("name", "address__street", "open_intervals")) == first
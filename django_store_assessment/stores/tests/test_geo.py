@@ -0,0 +1,77 @@
+import pytest
+
+from django_store_assessment.stores.geo import bounding_boxes, parse_near, stores_near
+from django_store_assessment.stores.geocoding import OfflineGeocoder
+from django_store_assessment.stores.models import Address, Store
+from django_store_assessment.stores.tests.factories import AddressFactory, StoreFactory
+
+PARIS = (48.8566, 2.3522)
+LONDON = (51.5074, -0.1278)
+
+
+def test_parse_near():
+    assert parse_near("48.8566,2.3522") == PARIS
+    assert parse_near(" -90 , 180 ") == (-90, 180)
+    for value in ["48.8566", "48.8566,2.3522,1", "north,east", "91,0", "0,-180.5", "nan,0"]:
+        with pytest.raises(ValueError):
+            parse_near(value)
+
+
+def test_bounding_boxes():
+    [((min_longitude, min_latitude), (max_longitude, max_latitude))] = bounding_boxes(*PARIS, 10)
+    assert min_latitude == pytest.approx(48.7667, abs=1e-4)
+    assert max_latitude == pytest.approx(48.9465, abs=1e-4)
+    # Meridians converge, a kilometre spans more longitude than latitude
+    assert min_longitude == pytest.approx(2.2155, abs=1e-4)
+    assert max_longitude == pytest.approx(2.4889, abs=1e-4)
+
+
+def test_bounding_boxes_across_the_antimeridian_and_around_poles():
+    east, west = bounding_boxes(0, 179.95, 20)
+    assert east[0][0] == pytest.approx(179.77, abs=0.01) and east[1][0] == 180
+    assert west[0][0] == -180 and west[1][0] == pytest.approx(-179.87, abs=0.01)
+
+    assert bounding_boxes(89.95, 10, 20) == [((-180, pytest.approx(89.77, abs=0.01)), (180, 90))]
+
+
+@pytest.mark.django_db
+def test_stores_near_orders_by_great_circle_distance():
+    london = StoreFactory.create(address=AddressFactory.create(latitude=LONDON[0], longitude=LONDON[1]))
+    paris = StoreFactory.create(address=AddressFactory.create(latitude=PARIS[0] + 0.01, longitude=PARIS[1]))
+    StoreFactory.create(address=None)
+
+    # London is 343.5 km from Paris
+    assert list(stores_near(Store.objects.all(), *PARIS, 344)) == [paris, london]
+    assert list(stores_near(Store.objects.all(), *PARIS, 343)) == [paris]
+    assert list(stores_near(Store.objects.all(), *LONDON, 344)) == [london, paris]
+
+
+@pytest.mark.django_db
+class TestGeocoding:
+    def test_new_addresses_are_geocoded(self):
+        address = AddressFactory.create()
+
+        address.refresh_from_db()
+        assert (address.latitude, address.longitude) == OfflineGeocoder().geocode(address)
+        assert -55.1 < address.latitude < 70.1 and -180 <= address.longitude <= 180
+
+    def test_given_coordinates_are_kept(self):
+        address = AddressFactory.create(latitude=PARIS[0], longitude=PARIS[1])
+
+        address.refresh_from_db()
+        assert (address.latitude, address.longitude) == PARIS
+
+    def test_without_a_geocoder(self, settings):
+        settings.STORES_GEOCODER = ""
+
+        assert AddressFactory.create().latitude is None
+
+    def test_offline_geocoder_keeps_cities_together(self):
+        geocoder = OfflineGeocoder()
+        first = geocoder.geocode(AddressFactory.build(city="Springfield", state="EX", country="Exampleland"))
+        second = geocoder.geocode(AddressFactory.build(city="Springfield", state="EX", country="Exampleland"))
+        other = geocoder.geocode(AddressFactory.build(city="Shelbyville", state="EX", country="Exampleland"))
+
+        assert abs(first[0] - second[0]) <= 2 * geocoder.spread
+        assert first != other
+        assert Address.objects.count() == 0
@@ -0,0 +1,109 @@
+import datetime
+
+import pytest
+from django.db import IntegrityError, connection
+
+from django_store_assessment.stores.copy import COPY_MIN_ROWS, copy_rows
+from django_store_assessment.stores.managers import slot_cache
+from django_store_assessment.stores.models import OpeningHours, Store
+from django_store_assessment.stores.tests.factories import StoreFactory
+
+NINE = datetime.time(9, 0)
+FIVE = datetime.time(17, 0)
+
+
+@pytest.fixture(autouse=True)
+def clear_slot_cache():
+    slot_cache.clear()
+    yield
+    slot_cache.clear()
+
+
+@pytest.mark.django_db
+class TestOpeningHoursManager:
+    def test_resolve_creates_missing_slots_once(self):
+        existing = OpeningHours.objects.create(weekday=1, from_hour=NINE, to_hour=FIVE)
+
+        resolved = OpeningHours.objects.resolve([(1, NINE, FIVE), (2, NINE, FIVE), (2, NINE, FIVE)])
+
+        assert resolved[(1, NINE, FIVE)].pk == existing.pk
+        assert resolved[(2, NINE, FIVE)].pk
+        assert OpeningHours.objects.count() == 2
+
+    def test_resolve_serves_committed_slots_from_cache(
+        self, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            created = OpeningHours.objects.resolve([(1, NINE, FIVE)])
+
+        with django_assert_num_queries(0):
+            resolved = OpeningHours.objects.resolve([(1, NINE, FIVE)])
+
+        assert resolved[(1, NINE, FIVE)].pk == created[(1, NINE, FIVE)].pk
+
+    def test_resolve_does_not_cache_uncommitted_slots(self):
+        OpeningHours.objects.resolve([(1, NINE, FIVE)])
+
+        assert slot_cache.get((1, NINE, FIVE)) is None
+
+    def test_editing_a_slot_invalidates_the_cache(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            opening_hours = OpeningHours.objects.resolve([(1, NINE, FIVE)])[(1, NINE, FIVE)]
+
+        opening_hours = OpeningHours.objects.get(pk=opening_hours.pk)
+        opening_hours.weekday = 2
+        opening_hours.save()
+
+        assert slot_cache.get((1, NINE, FIVE)) is None
+
+    def test_link_resolves_slots_deleted_elsewhere_again(self):
+        store = StoreFactory.create()
+        Through = Store.opening_hours.through
+        # Another process deleted the cached slot
+        slot_cache.update({(1, NINE, FIVE): 0})
+
+        resolved = OpeningHours.objects.link(
+            [(1, NINE, FIVE)],
+            lambda opening_hours: Through.objects.bulk_create(
+                Through(store_id=store.pk, openinghours_id=oh.pk) for oh in opening_hours.values()
+            ),
+        )
+
+        assert resolved[(1, NINE, FIVE)].pk == OpeningHours.objects.get().pk
+        assert list(store.opening_hours.all()) == [OpeningHours.objects.get()]
+        assert slot_cache.get((1, NINE, FIVE)) is None
+
+    def test_link_resolves_slots_deleted_elsewhere_again_with_copy(self):
+        stores = Store.objects.bulk_create(Store(name=f"Store {i}") for i in range(COPY_MIN_ROWS))
+        Through = Store.opening_hours.through
+        slot_cache.update({(1, NINE, FIVE): 0})
+
+        # Enough links for copy_rows() to use COPY
+        OpeningHours.objects.link(
+            [(1, NINE, FIVE)],
+            lambda opening_hours: copy_rows(
+                Through,
+                ["store_id", "openinghours_id"],
+                [(store.pk, oh.pk) for store in stores for oh in opening_hours.values()],
+            ),
+        )
+
+        assert Through.objects.filter(openinghours=OpeningHours.objects.get()).count() == COPY_MIN_ROWS
+        assert slot_cache.get((1, NINE, FIVE)) is None
+
+    def test_links_check_slots_immediately(self):
+        Through = Store.opening_hours.through
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT condeferrable, condeferred FROM pg_constraint "
+                "WHERE conrelid = %s::regclass AND confrelid = %s::regclass AND contype = 'f'",
+                [Through._meta.db_table, OpeningHours._meta.db_table],
+            )
+            # Set by migration 0010, see Store.opening_hours
+            assert cursor.fetchall() == [(True, False)]
+
+    def test_slots_are_unique(self):
+        OpeningHours.objects.create(weekday=1, from_hour=NINE, to_hour=FIVE)
+
+        with pytest.raises(IntegrityError):
+            OpeningHours.objects.create(weekday=1, from_hour=NINE, to_hour=FIVE)
@@ -0,0 +1,216 @@
+import datetime
+import importlib
+
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from django_store_assessment.stores.models import OpeningHours, Store
+from django_store_assessment.stores.schedule import (
+    MINUTES_PER_WEEK,
+    local_minute_of_week,
+    open_intervals,
+    open_now_q,
+    parse_open_at,
+    zone_band,
+    zoned_intervals,
+)
+from django_store_assessment.stores.tests.factories import OpeningHoursFactory, StoreFactory
+
+
+def test_open_intervals_merges_overlapping_slots():
+    slots = [
+        (2, datetime.time(13, 0), datetime.time(18, 0)),
+        (1, datetime.time(9, 0), datetime.time(12, 0)),
+        (2, datetime.time(9, 0), datetime.time(14, 0)),
+    ]
+
+    assert open_intervals(slots) == [(540, 720), (1980, 2520)]
+
+
+def test_open_intervals_of_overnight_slots():
+    slots = [
+        (1, datetime.time(9, 0), datetime.time(17, 0)),
+        (5, datetime.time(22, 0), datetime.time(2, 0)),
+        # Sunday night ends on Monday morning, at the start of the week
+        (7, datetime.time(20, 0), datetime.time(0, 30)),
+        (1, datetime.time(0, 15), datetime.time(1, 0)),
+    ]
+
+    assert open_intervals(slots) == [(0, 60), (540, 1020), (7080, 7320), (9840, MINUTES_PER_WEEK)]
+
+
+def test_parse_open_at():
+    assert parse_open_at("1T00:00") == 0
+    assert parse_open_at("2T14:30") == 1440 + 14 * 60 + 30
+    with pytest.raises(ValueError):
+        parse_open_at("8T14:30")
+    with pytest.raises(ValueError):
+        parse_open_at("2T24:00")
+
+
+def test_local_minute_of_week():
+    # Monday noon in UTC
+    instant = datetime.datetime(2024, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+    assert local_minute_of_week(instant, "UTC") == 12 * 60
+    assert local_minute_of_week(instant, "Asia/Tokyo") == 21 * 60
+    assert local_minute_of_week(instant, "America/Los_Angeles") == 4 * 60
+    # Already Tuesday in Auckland, and Sunday evening before Monday in Honolulu wraps around the week
+    assert local_minute_of_week(instant, "Pacific/Auckland") == 1440 + 60
+    assert local_minute_of_week(instant - datetime.timedelta(hours=12), "Pacific/Honolulu") == 6 * 1440 + 14 * 60
+    # Summer time
+    assert local_minute_of_week(instant.replace(month=7), "Europe/Berlin") == 14 * 60
+
+
+def test_zoned_intervals():
+    start = zone_band("Europe/Berlin") * MINUTES_PER_WEEK
+
+    assert zoned_intervals([(0, 10), (20, 30)], "Europe/Berlin") == [(start, start + 10), (start + 20, start + 30)]
+    assert zoned_intervals([(0, 10)], "UTC") != zoned_intervals([(0, 10)], "Europe/Berlin")
+
+
+@pytest.mark.django_db
+def test_zone_band_matches_the_migration():
+    migration = importlib.import_module("django_store_assessment.stores.migrations.0008_store_timezone")
+    store = StoreFactory.create(timezone="Europe/Berlin")
+    store.opening_hours.add(OpeningHoursFactory.create(weekday=1), OpeningHoursFactory.create(weekday=3))
+    expected = Store.objects.get(pk=store.pk).zoned_open_intervals
+    Store.objects.update(zoned_open_intervals=[])
+
+    with connection.schema_editor() as schema_editor:
+        migration.fill_zoned_open_intervals(None, schema_editor)
+    assert Store.objects.get(pk=store.pk).zoned_open_intervals == expected
+
+
+@pytest.mark.django_db
+def test_collapse_overnight_slots():
+    migration = importlib.import_module("django_store_assessment.stores.migrations.0009_collapse_overnight_slots")
+
+    def slot(weekday, from_hour, to_hour):
+        return OpeningHoursFactory.create(
+            weekday=weekday, from_hour=datetime.time(*from_hour), to_hour=datetime.time(*to_hour)
+        )
+
+    friday_night = slot(5, (22, 0), (23, 59))
+    friday = StoreFactory.create()
+    friday.opening_hours.add(slot(1, (9, 0), (17, 0)), friday_night, slot(6, (0, 0), (2, 0)))
+    sunday = StoreFactory.create()
+    sunday.opening_hours.add(slot(7, (22, 0), (23, 59)), slot(1, (0, 0), (2, 0)))
+    evening_only = StoreFactory.create()
+    evening_only.opening_hours.add(friday_night)
+    # More than a day, kept as it is
+    long_day = StoreFactory.create()
+    long_day.opening_hours.add(slot(2, (8, 0), (23, 59)), slot(3, (0, 0), (9, 0)))
+
+    migration.collapse_overnight_slots(apps, None)
+
+    def slots(store):
+        return sorted((oh.weekday, oh.from_hour.hour, oh.to_hour.hour) for oh in store.opening_hours.all())
+
+    assert slots(friday) == [(1, 9, 17), (5, 22, 2)]
+    assert slots(sunday) == [(7, 22, 2)]
+    assert slots(evening_only) == [(5, 22, 23)]
+    assert slots(long_day) == [(2, 8, 23), (3, 0, 9)]
+    # Morning slots left without stores are gone
+    assert not OpeningHours.objects.filter(from_hour=datetime.time(0, 0), to_hour=datetime.time(2, 0)).exists()
+
+    sunday.refresh_from_db()
+    assert sunday.open_intervals == [(0, 120), (9960, MINUTES_PER_WEEK)]
+    assert sunday.zoned_open_intervals == zoned_intervals(sunday.open_intervals, sunday.timezone)
+
+
+@pytest.mark.django_db
+def test_split_overnight_slots():
+    migration = importlib.import_module("django_store_assessment.stores.migrations.0009_collapse_overnight_slots")
+    friday = StoreFactory.create(timezone="Europe/Berlin")
+    friday.opening_hours.add(
+        OpeningHoursFactory.create(weekday=1, from_hour="09:00", to_hour="17:00"),
+        OpeningHoursFactory.create(weekday=5, from_hour="22:00", to_hour="02:00"),
+    )
+    sunday = StoreFactory.create()
+    sunday.opening_hours.add(OpeningHoursFactory.create(weekday=7, from_hour="22:00", to_hour="00:00"))
+
+    migration.split_overnight_slots(apps, None)
+
+    def slots(store):
+        return sorted(
+            (oh.weekday, oh.from_hour.strftime("%H:%M"), oh.to_hour.strftime("%H:%M"))
+            for oh in store.opening_hours.all()
+        )
+
+    assert slots(friday) == [(1, "09:00", "17:00"), (5, "22:00", "23:59"), (6, "00:00", "02:00")]
+    # Closing at midnight leaves no morning slot
+    assert slots(sunday) == [(7, "22:00", "23:59")]
+    assert not OpeningHours.objects.filter(weekday=5, from_hour="22:00", to_hour="02:00").exists()
+
+    for store in (friday, sunday):
+        store.refresh_from_db()
+        expected = open_intervals((oh.weekday, oh.from_hour, oh.to_hour) for oh in store.opening_hours.all())
+        assert store.open_intervals == expected
+        assert store.zoned_open_intervals == zoned_intervals(expected, store.timezone)
+
+
+@pytest.mark.django_db
+def test_open_now_q():
+    berlin = StoreFactory.create(timezone="Europe/Berlin")
+    berlin.opening_hours.add(OpeningHoursFactory.create(weekday=1, from_hour="09:00", to_hour="17:00"))
+    new_york = StoreFactory.create(timezone="America/New_York")
+    new_york.opening_hours.add(OpeningHoursFactory.create(weekday=1, from_hour="09:00", to_hour="17:00"))
+    # 09:30 in Berlin, 03:30 in New York
+    instant = datetime.datetime(2024, 1, 1, 8, 30, tzinfo=datetime.timezone.utc)
+    stores = Store.objects.all()
+
+    assert Store.objects.timezones() == ["America/New_York", "Europe/Berlin"]
+    assert list(stores.filter(open_now_q(instant, Store.objects.timezones()))) == [berlin]
+    assert list(stores.filter(open_now_q(instant + datetime.timedelta(hours=6), ["America/New_York"]))) == [new_york]
+    assert not stores.filter(open_now_q(instant, [])).exists()
+
+
+@pytest.mark.django_db
+class TestOpenIntervalsSync:
+    def test_add_and_remove_opening_hours(self):
+        store = StoreFactory.create()
+        monday = OpeningHoursFactory.create(weekday=1)
+        tuesday = OpeningHoursFactory.create(weekday=2)
+
+        store.opening_hours.add(monday, tuesday)
+        assert Store.objects.get(pk=store.pk).open_intervals == [(540, 1200), (1980, 2640)]
+
+        store.opening_hours.remove(monday)
+        assert Store.objects.get(pk=store.pk).open_intervals == [(1980, 2640)]
+
+        tuesday.stores.clear()
+        assert Store.objects.get(pk=store.pk).open_intervals == []
+
+    def test_zoned_open_intervals_follow_the_timezone(self):
+        store = StoreFactory.create(timezone="Europe/Berlin")
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1))
+        store.refresh_from_db()
+        assert store.zoned_open_intervals == zoned_intervals([(540, 1200)], "Europe/Berlin")
+
+        store.timezone = "Asia/Tokyo"
+        store.save(update_fields=["timezone"])
+        assert Store.objects.get(pk=store.pk).zoned_open_intervals == zoned_intervals([(540, 1200)], "Asia/Tokyo")
+
+    def test_editing_opening_hours_updates_every_store(self):
+        stores = StoreFactory.create_batch(2)
+        opening_hours = OpeningHoursFactory.create(weekday=1)
+        opening_hours.stores.add(*stores)
+
+        opening_hours.to_hour = datetime.time(10, 0)
+        opening_hours.save()
+
+        assert all(store.open_intervals == [(540, 600)] for store in Store.objects.all())
+
+        opening_hours.delete()
+
+        assert all(store.open_intervals == [] for store in Store.objects.all())
+
+    def test_open_at_lookup(self):
+        store = StoreFactory.create()
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=2))
+        StoreFactory.create()
+
+        assert list(Store.objects.filter(open_intervals__contains=parse_open_at("2T14:30"))) == [store]
+        assert not Store.objects.filter(open_intervals__contains=parse_open_at("2T20:00")).exists()
@@ -1,31 +1,30 @@
+import csv
+import datetime
+import json
+from typing import Any
+
 import pytest
-from django.urls import reverse
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
-from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.api.serializers import StoreSerializer, field_paths, field_tree, select_fields
+from django_store_assessment.stores.api.views import StoreViewSet
+from django_store_assessment.stores.geocoding import OfflineGeocoder
+from django_store_assessment.stores.managers import slot_cache
+from django_store_assessment.stores.models import Address, OpeningHours, Store
 from django_store_assessment.stores.tests.factories import AddressFactory, OpeningHoursFactory, StoreFactory
-from django_store_assessment.users.tests.factories import UserFactory
 
 ALL_STORES_URL = reverse("store-list")
-
-
-@pytest.fixture
-def user():
-    return UserFactory.create()
-
-
-@pytest.fixture
-def token(user):
-    return Token.objects.create(user=user)
-
-
-@pytest.fixture
-def api_client(token):
-    client = APIClient()
-    client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
-    return client
+BULK_STORES_URL = reverse("store-bulk")
+SEARCH_STORES_URL = reverse("store-search")
+EXPORT_STORES_URL = reverse("store-export")
 
 
 class TestStoreViewSet:
@@ -63,6 +62,20 @@ class TestStoreViewSet:
         assert response.data["opening_hours"][1]["from_hour"] == "08:00:00"
         assert response.data["opening_hours"][1]["to_hour"] == "17:00:00"
 
+    @pytest.mark.django_db
+    def test_create_store_with_a_slot_deleted_elsewhere(self, api_client):
+        # The slot cache of this process still maps the slot to a deleted row
+        slot_cache.update({(1, datetime.time(8, 0), datetime.time(17, 0)): 0})
+        payload = {
+            "name": "Example Store",
+            "opening_hours": [{"weekday": 1, "from_hour": "08:00", "to_hour": "17:00"}],
+        }
+
+        response = api_client.post(ALL_STORES_URL, payload, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Store.objects.get().opening_hours.get().pk == OpeningHours.objects.get().pk
+
     @pytest.mark.django_db
     def test_create_store_without_address(self, api_client):
         payload = {
@@ -163,7 +176,7 @@ class TestStoreViewSet:
                 "country": "Exampleland",
             },
             "opening_hours": [
-                {"weekday": 1, "from_hour": "17:00", "to_hour": "08:00"}  # from_hour is greater than to_hour
+                {"weekday": 1, "from_hour": "17:00", "to_hour": "17:00"}  # from_hour is the same as to_hour
             ],
         }
 
@@ -363,3 +376,771 @@ class TestStoreViewSet:
         assert response.data["count"] == 11
         assert response.data["next"] is None
         assert response.data["previous"] is not None
+
+    @pytest.mark.django_db
+    def test_list_query_count_is_constant(self, api_client, django_assert_num_queries):
+        for store in StoreFactory.create_batch(10):
+            store.opening_hours.add(OpeningHoursFactory.create(weekday=1), OpeningHoursFactory.create(weekday=2))
+
+        # token lookup, count, page of stores with their address and the
+        # opening hours prefetch; reads run outside a transaction
+        with django_assert_num_queries(4):
+            response = api_client.get(ALL_STORES_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 10
+        assert all(len(result["opening_hours"]) == 2 for result in response.data["results"])
+
+    @pytest.mark.django_db
+    def test_filtered_list_query_count_is_constant(self, api_client, django_assert_num_queries):
+        for store in StoreFactory.create_batch(5):
+            store.opening_hours.add(OpeningHoursFactory.create(weekday=1), OpeningHoursFactory.create(weekday=2))
+
+        with django_assert_num_queries(4):
+            response = api_client.get(ALL_STORES_URL, {"opening_hours__weekday": 1})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 5
+
+    @pytest.mark.django_db
+    def test_retrieve_query_count_is_constant(self, api_client, django_assert_num_queries):
+        store = StoreFactory.create()
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1), OpeningHoursFactory.create(weekday=2))
+
+        url = reverse("store-detail", args=[store.id])
+        # token lookup, store with its address and the opening hours prefetch
+        with django_assert_num_queries(3):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["opening_hours"]) == 2
+
+    @pytest.mark.django_db
+    def test_sparse_fields(self, api_client, django_assert_num_queries):
+        for store in StoreFactory.create_batch(3):
+            store.opening_hours.add(OpeningHoursFactory.create(weekday=1))
+
+        # token lookup, count and page of stores, no join and no prefetch
+        with django_assert_num_queries(3) as queries:
+            response = api_client.get(ALL_STORES_URL, {"fields": "id,name"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert all(result.keys() == {"id", "name"} for result in response.data["results"])
+        page_sql = queries.captured_queries[-1]["sql"]
+        assert "JOIN" not in page_sql
+        assert "search_vector" not in page_sql
+
+    @pytest.mark.django_db
+    def test_omit_fields(self, api_client, django_assert_num_queries):
+        store = StoreFactory.create()
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1))
+        url = reverse("store-detail", args=[store.id])
+
+        # token lookup and the store with its address, no prefetch
+        with django_assert_num_queries(2):
+            response = api_client.get(url, {"omit": "opening_hours,address.country"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data.keys() == {"id", "name", "timezone", "address"}
+        assert response.data["address"].keys() == {"street", "city", "state", "postal_code", "latitude", "longitude"}
+
+    @pytest.mark.django_db
+    def test_nested_sparse_fields(self, api_client):
+        store = StoreFactory.create()
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=3))
+
+        response = api_client.get(
+            reverse("store-detail", args=[store.id]), {"fields": "id,address.city,opening_hours.weekday"}
+        )
+
+        assert response.data == {
+            "id": store.id,
+            "address": {"city": store.address.city},
+            "opening_hours": [{"weekday": 3}],
+        }
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("param", ["fields", "omit"])
+    def test_unknown_sparse_fields_fail(self, api_client, param):
+        response = api_client.get(ALL_STORES_URL, {param: "id,address.nope"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {param: ["Unknown field: address.nope"]}
+
+    @pytest.mark.django_db
+    def test_writes_ignore_sparse_fields(self, api_client):
+        response = api_client.post(f"{ALL_STORES_URL}?fields=id", {"name": "Full Store"}, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data.keys() == {"id", "name", "timezone", "address", "opening_hours"}
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {},
+            {"fields": "opening_hours.to_hour,address.city,id"},
+            {"omit": "address"},
+            {"omit": "opening_hours.weekday"},
+        ],
+    )
+    def test_list_renders_like_store_serializer(self, api_client, params):
+        # Listings are built from .values() rows, the JSON must stay the same
+        stores = [
+            StoreFactory.create(name='Caf\u00e9 \u2028 "Store"'),
+            StoreFactory.create(address=None),
+            StoreFactory.create(),
+        ]
+        stores[0].opening_hours.add(
+            OpeningHoursFactory.create(weekday=2, from_hour="13:00", to_hour="18:30:15"),
+            OpeningHoursFactory.create(weekday=1),
+            OpeningHoursFactory.create(weekday=2, from_hour="08:00", to_hour="12:00"),
+        )
+        stores[1].opening_hours.add(OpeningHoursFactory.create(weekday=7))
+        tree = field_tree(StoreSerializer)
+        fields = select_fields(
+            tree,
+            fields=field_paths(tree, params["fields"]) if "fields" in params else None,
+            omit=field_paths(tree, params.get("omit", "")),
+        )
+        queryset = StoreSerializer.setup_eager_loading(Store.objects.order_by("id"))
+        expected = {
+            "count": 3,
+            "next": None,
+            "previous": None,
+            "results": StoreSerializer(queryset, many=True, fields=fields).data,
+        }
+
+        response = api_client.get(ALL_STORES_URL, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == JSONRenderer().render(expected)
+
+    @pytest.mark.django_db
+    def test_get_cursor_paginated_results(self, api_client):
+        stores = StoreFactory.create_batch(11)
+
+        response = api_client.get(ALL_STORES_URL, {"pagination": "cursor"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert [result["id"] for result in response.data["results"]] == [store.id for store in stores[:10]]
+        assert response.data["next"] is not None
+        assert response.data["previous"] is None
+
+        # Get the next page
+        response = api_client.get(response.data["next"])
+        assert response.status_code == status.HTTP_200_OK
+        assert [result["id"] for result in response.data["results"]] == [stores[10].id]
+        assert response.data["next"] is None
+        assert response.data["previous"] is not None
+
+    @pytest.mark.django_db
+    def test_cursor_pagination_skips_count_and_offset(self, api_client):
+        StoreFactory.create_batch(25)
+        response = api_client.get(ALL_STORES_URL, {"pagination": "cursor"})
+        response = api_client.get(response.data["next"])
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(response.data["next"])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 5
+        for query in context.captured_queries:
+            assert "COUNT(" not in query["sql"]
+            assert "OFFSET" not in query["sql"]
+
+    @pytest.mark.django_db
+    def test_filter_by_near(self, api_client):
+        # Two stores in Paris, one in Versailles (17 km) and one in London (343 km)
+        far = StoreFactory.create(address=AddressFactory.create(latitude=51.5074, longitude=-0.1278))
+        suburb = StoreFactory.create(address=AddressFactory.create(latitude=48.8049, longitude=2.1204))
+        near = StoreFactory.create(address=AddressFactory.create(latitude=48.8600, longitude=2.3500))
+        nearest = StoreFactory.create(address=AddressFactory.create(latitude=48.8570, longitude=2.3520))
+        StoreFactory.create(address=None)
+
+        response = api_client.get(ALL_STORES_URL, {"near": "48.8566,2.3522"})
+        assert response.status_code == status.HTTP_200_OK
+        assert [result["id"] for result in response.data["results"]] == [nearest.id, near.id]
+
+        response = api_client.get(ALL_STORES_URL, {"near": "48.8566,2.3522", "radius": "500", "pagination": "cursor"})
+        assert [result["id"] for result in response.data["results"]] == [nearest.id, near.id, suburb.id, far.id]
+        assert response.data["results"][0]["address"]["latitude"] == 48.8570
+
+    @pytest.mark.django_db
+    def test_filter_by_near_uses_the_location_index(self, api_client):
+        StoreFactory.create(address=AddressFactory.create(latitude=48.8570, longitude=2.3520))
+
+        with CaptureQueriesContext(connection) as context:
+            api_client.get(ALL_STORES_URL, {"near": "48.8566,2.3522", "radius": "5"})
+
+        page_sql = context.captured_queries[-2]["sql"]
+        assert 'point("stores_address"."longitude", "stores_address"."latitude") <@' in page_sql
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "params",
+        [{"near": "48.8566"}, {"near": "91,0"}, {"near": "0,0", "radius": "-1"}, {"near": "0,0", "radius": "1001"}],
+    )
+    def test_filter_by_invalid_near_fails(self, api_client, params):
+        response = api_client.get(ALL_STORES_URL, params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_address_coordinates(self, api_client):
+        payload = {
+            "name": "Located Store",
+            "address": {
+                "street": "1 Rue de Rivoli",
+                "city": "Paris",
+                "state": "IDF",
+                "postal_code": "75001",
+                "country": "France",
+                "latitude": 48.8566,
+                "longitude": 2.3522,
+            },
+        }
+        response = api_client.post(ALL_STORES_URL, payload, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["address"]["latitude"] == 48.8566
+        url = reverse("store-detail", args=[response.data["id"]])
+
+        # Moving the address without coordinates has the geocoder look it up
+        response = api_client.patch(url, {"address": {"street": "2 Rue de Rivoli"}}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        address = Address.objects.get()
+        assert (address.latitude, address.longitude) == OfflineGeocoder().geocode(address)
+
+        response = api_client.patch(url, {"address": {"latitude": 48.8566}}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {"address": {"non_field_errors": ["latitude and longitude must be given together"]}}
+
+    @pytest.mark.django_db
+    def test_filter_by_open_now(self, api_client, monkeypatch, django_assert_num_queries):
+        stores = {}
+        for name, timezone, from_hour, to_hour in [
+            ("berlin", "Europe/Berlin", "09:00", "17:00"),
+            ("new_york", "America/New_York", "09:00", "17:00"),
+            ("tokyo", "Asia/Tokyo", "09:00", "17:00"),
+            ("tokyo_evening", "Asia/Tokyo", "17:00", "20:00"),
+        ]:
+            stores[name] = StoreFactory.create(name=name, timezone=timezone)
+            stores[name].opening_hours.add(OpeningHoursFactory.create(weekday=1, from_hour=from_hour, to_hour=to_hour))
+        # Monday 09:30 in Berlin, 03:30 in New York and 17:30 in Tokyo
+        now = datetime.datetime(2024, 1, 1, 8, 30, tzinfo=datetime.timezone.utc)
+        monkeypatch.setattr("django.utils.timezone.now", lambda: now)
+
+        # token lookup, timezones, count, page of stores and their opening hours
+        with django_assert_num_queries(5):
+            response = api_client.get(ALL_STORES_URL, {"open_now": "true"})
+        assert [result["name"] for result in response.data["results"]] == ["berlin", "tokyo_evening"]
+
+        response = api_client.get(ALL_STORES_URL, {"open_now": "false"})
+        assert [result["name"] for result in response.data["results"]] == ["new_york", "tokyo"]
+
+        # Cached responses are only reused within the same minute
+        now += datetime.timedelta(hours=6)
+        response = api_client.get(ALL_STORES_URL, {"open_now": "true"})
+        assert [result["name"] for result in response.data["results"]] == ["berlin", "new_york"]
+
+    @pytest.mark.django_db
+    def test_retrieve_with_open_now(self, api_client, monkeypatch):
+        store = StoreFactory.create(timezone="Europe/Berlin")
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1, from_hour="09:00", to_hour="17:00"))
+        now = datetime.datetime(2024, 1, 1, 8, 30, tzinfo=datetime.timezone.utc)
+        monkeypatch.setattr("django.utils.timezone.now", lambda: now)
+        url = reverse("store-detail", args=[store.id])
+
+        response = api_client.get(url, {"open_now": "true"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["id"] == store.id
+        assert api_client.get(url, {"open_now": "false"}).status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.django_db
+    def test_search_ignores_timezones(self, api_client):
+        StoreFactory.create(name="Berlin Bakery", timezone="Europe/Berlin")
+        StoreFactory.create(name="Corner Shop", timezone="Europe/Berlin")
+
+        response = api_client.get(ALL_STORES_URL, {"search": "Europe"})
+        assert response.data["results"] == []
+
+        response = api_client.get(ALL_STORES_URL, {"search": "Berlin"})
+        assert [result["name"] for result in response.data["results"]] == ["Berlin Bakery"]
+
+    @pytest.mark.django_db
+    def test_create_store_with_unknown_timezone_fails(self, api_client):
+        response = api_client.post(ALL_STORES_URL, {"name": "Nowhere", "timezone": "Mars/Olympus_Mons"}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {"timezone": ["Unknown timezone: Mars/Olympus_Mons"]}
+
+    @pytest.mark.django_db
+    def test_filter_by_open_at(self, api_client):
+        payload = {
+            "name": "Example Store",
+            "opening_hours": [{"weekday": 2, "from_hour": "08:00", "to_hour": "17:00"}],
+        }
+        response = api_client.post(ALL_STORES_URL, payload, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        StoreFactory.create_batch(2)
+
+        response = api_client.get(ALL_STORES_URL, {"open_at": "2T14:30"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [result["name"] for result in response.data["results"]] == ["Example Store"]
+
+        response = api_client.get(ALL_STORES_URL, {"open_at": "2T17:00"})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 0
+
+    @pytest.mark.django_db
+    def test_filter_by_open_at_overnight(self, api_client):
+        payload = {
+            "name": "Late Store",
+            "opening_hours": [
+                {"weekday": 5, "from_hour": "22:00", "to_hour": "02:00"},
+                {"weekday": 7, "from_hour": "22:00", "to_hour": "02:00"},
+            ],
+        }
+        response = api_client.post(ALL_STORES_URL, payload, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert OpeningHours.objects.count() == 2
+
+        for open_at in ["5T23:59", "6T00:00", "6T01:59", "7T22:00", "1T01:00"]:
+            assert len(api_client.get(ALL_STORES_URL, {"open_at": open_at}).data["results"]) == 1, open_at
+        for open_at in ["5T21:59", "6T02:00", "1T02:00"]:
+            assert len(api_client.get(ALL_STORES_URL, {"open_at": open_at}).data["results"]) == 0, open_at
+
+    @pytest.mark.django_db
+    def test_filter_by_open_at_follows_updates(self, api_client):
+        store = StoreFactory.create()
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1))
+
+        payload = {
+            "name": store.name,
+            "opening_hours": [{"weekday": 3, "from_hour": "10:00", "to_hour": "12:00"}],
+        }
+        url = reverse("store-detail", args=[store.id])
+        assert api_client.put(url, payload, format="json").status_code == status.HTTP_200_OK
+
+        assert len(api_client.get(ALL_STORES_URL, {"open_at": "1T10:00"}).data["results"]) == 0
+        assert len(api_client.get(ALL_STORES_URL, {"open_at": "3T11:59"}).data["results"]) == 1
+
+    @pytest.mark.django_db
+    def test_filter_by_invalid_open_at_fails(self, api_client):
+        response = api_client.get(ALL_STORES_URL, {"open_at": "Tuesday 14:30"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_bulk_create_stores(self, api_client):
+        payload = [
+            {
+                "name": f"Example Store {i}",
+                "address": {
+                    "street": f"{i} Example St",
+                    "city": "Example City",
+                    "state": "EX",
+                    "postal_code": "12345",
+                    "country": "Exampleland",
+                },
+                "opening_hours": [
+                    {"weekday": 1, "from_hour": "08:00", "to_hour": "17:00"},
+                    {"weekday": 2, "from_hour": "08:00", "to_hour": "17:00"},
+                ],
+            }
+            for i in range(3)
+        ]
+        payload.append({"name": "Bare Store"})
+
+        response = api_client.post(BULK_STORES_URL, payload, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data["ids"]) == 4
+        stores = Store.objects.filter(id__in=response.data["ids"]).order_by("id")
+        assert [store.name for store in stores] == [item["name"] for item in payload]
+        address = stores[0].address
+        assert address is not None and address.street == "0 Example St"
+        assert stores[3].address is None
+        assert stores[0].opening_hours.count() == 2
+        assert stores[3].opening_hours.count() == 0
+        # Shared slots are stored once
+        assert OpeningHours.objects.count() == 2
+        assert stores[0].open_intervals == [(480, 1020), (1920, 2460)]
+
+    @pytest.mark.django_db
+    def test_bulk_create_query_count_is_constant(self, api_client, django_assert_num_queries):
+        payload = [
+            {
+                "name": f"Example Store {i}",
+                "address": {
+                    "street": f"{i} Example St",
+                    "city": "Example City",
+                    "state": "EX",
+                    "postal_code": "12345",
+                    "country": "Exampleland",
+                },
+                "opening_hours": [{"weekday": i % 7 + 1, "from_hour": "08:00", "to_hour": "17:00"}],
+            }
+            for i in range(50)
+        ]
+
+        # savepoint pair from ATOMIC_REQUESTS, token lookup, savepoint pair for the
+        # batch, addresses, existing slots, slot insert and read back, stores,
+        # through rows
+        with django_assert_num_queries(11):
+            response = api_client.post(BULK_STORES_URL, payload, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Store.objects.count() == 50
+
+    @pytest.mark.django_db
+    def test_bulk_create_reports_errors_per_item(self, api_client):
+        payload = [
+            {"name": "Valid Store"},
+            {"address": {"street": "123 Example St"}},
+            {"name": "Invalid Hours", "opening_hours": [{"weekday": 1, "from_hour": "17:00", "to_hour": "17:00"}]},
+        ]
+
+        response = api_client.post(BULK_STORES_URL, payload, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert "name" in response.data[1]
+        assert "city" in response.data[1]["address"]
+        assert "opening_hours" in response.data[2]
+        assert not Store.objects.exists()
+
+    @pytest.mark.django_db
+    def test_bulk_create_requires_a_list(self, api_client):
+        response = api_client.post(BULK_STORES_URL, {"name": "Example Store"}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Store.objects.exists()
+
+    @pytest.mark.django_db
+    def test_partial_update_keeps_opening_hours(self, api_client):
+        store = StoreFactory.create()
+        opening_hours = OpeningHoursFactory.create(weekday=1)
+        store.opening_hours.add(opening_hours)
+
+        url = reverse("store-detail", args=[store.id])
+        response = api_client.patch(url, {"name": "Renamed Store"}, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["name"] == "Renamed Store"
+        assert len(response.data["opening_hours"]) == 1
+        assert list(store.opening_hours.all()) == [opening_hours]
+        assert Store.objects.get(id=store.id).open_intervals == [(540, 1200)]
+
+    @pytest.mark.django_db
+    def test_partial_update_with_incomplete_opening_hours_fails(self, api_client):
+        store = StoreFactory.create()
+        url = reverse("store-detail", args=[store.id])
+
+        response = api_client.patch(url, {"opening_hours": [{"weekday": 1, "from_hour": "09:00"}]}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {"opening_hours": [{"to_hour": ["This field is required."]}]}
+
+    @pytest.mark.django_db
+    def test_update_only_changes_modified_opening_hours(self, api_client):
+        store = StoreFactory.create()
+        kept = OpeningHoursFactory.create(weekday=1)
+        removed = OpeningHoursFactory.create(weekday=2)
+        store.opening_hours.add(kept, removed)
+        kept_row = Store.opening_hours.through.objects.get(store=store, openinghours=kept)
+
+        payload = {
+            "opening_hours": [
+                {"weekday": 1, "from_hour": "09:00", "to_hour": "20:00"},
+                {"weekday": 3, "from_hour": "10:00", "to_hour": "12:00"},
+            ],
+        }
+        url = reverse("store-detail", args=[store.id])
+        response = api_client.patch(url, payload, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [oh["weekday"] for oh in response.data["opening_hours"]] == [1, 3]
+        assert Store.opening_hours.through.objects.filter(pk=kept_row.pk).exists()
+        assert OpeningHours.objects.filter(pk=removed.pk).exists()
+        assert Store.objects.get(id=store.id).open_intervals == [(540, 1200), (3480, 3600)]
+
+    @pytest.mark.django_db
+    def test_update_query_count_does_not_grow_with_slots(self, api_client, django_assert_num_queries):
+        store = StoreFactory.create()
+        store.opening_hours.add(*(OpeningHoursFactory.create(weekday=weekday) for weekday in range(1, 8)))
+
+        payload = {
+            "name": "Renamed Store",
+            "opening_hours": [
+                {"weekday": weekday, "from_hour": "09:00", "to_hour": "20:00"} for weekday in range(1, 7)
+            ]
+            + [{"weekday": 7, "from_hour": "10:00", "to_hour": "14:00"}],
+        }
+        url = reverse("store-detail", args=[store.id])
+        # savepoint pair from ATOMIC_REQUESTS, token lookup, store with address,
+        # opening hours prefetch, slot lookup, slot insert and read back, through
+        # row delete and insert, store update, opening hours for the response
+        with django_assert_num_queries(12):
+            response = api_client.put(url, payload, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["opening_hours"]) == 7
+
+    @pytest.mark.django_db
+    def test_search_ranks_name_matches_first(self, api_client):
+        by_address = StoreFactory.create(name="Corner Shop", address=AddressFactory.create(city="Springfield"))
+        by_name = StoreFactory.create(name="Springfield Grocery")
+        StoreFactory.create(name="Unrelated Store")
+
+        response = api_client.get(SEARCH_STORES_URL, {"q": "springfield"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [result["id"] for result in response.data["results"]] == [by_name.id, by_address.id]
+
+    @pytest.mark.django_db
+    def test_search_combines_with_filters(self, api_client):
+        StoreFactory.create(name="Springfield Grocery", address=AddressFactory.create(country="Exampleland"))
+        StoreFactory.create(name="Springfield Bakery", address=AddressFactory.create(country="Otherland"))
+
+        response = api_client.get(SEARCH_STORES_URL, {"q": "springfield", "address__country": "Otherland"})
+
+        assert [result["name"] for result in response.data["results"]] == ["Springfield Bakery"]
+
+    @pytest.mark.django_db
+    def test_search_follows_writes(self, api_client):
+        response = api_client.post(BULK_STORES_URL, [{"name": "Bulk Store"}], format="json")
+        store_id = response.data["ids"][0]
+        assert len(api_client.get(SEARCH_STORES_URL, {"q": "bulk"}).data["results"]) == 1
+
+        url = reverse("store-detail", args=[store_id])
+        payload: dict[str, Any] = {
+            "name": "Renamed Store",
+            "address": {
+                "street": "123 Example St",
+                "city": "Springfield",
+                "state": "EX",
+                "postal_code": "12345",
+                "country": "Exampleland",
+            },
+        }
+        api_client.patch(url, payload, format="json")
+        assert len(api_client.get(SEARCH_STORES_URL, {"q": "bulk"}).data["results"]) == 0
+        assert len(api_client.get(SEARCH_STORES_URL, {"q": "springfield"}).data["results"]) == 1
+
+        payload["address"]["city"] = "Shelbyville"
+        api_client.patch(url, payload, format="json")
+        assert len(api_client.get(SEARCH_STORES_URL, {"q": "springfield"}).data["results"]) == 0
+        assert len(api_client.get(SEARCH_STORES_URL, {"q": "shelbyville"}).data["results"]) == 1
+
+    @pytest.mark.django_db
+    def test_search_by_name_after_address_edit(self, api_client):
+        store = StoreFactory.create(name="Corner Grocery", address=AddressFactory.create(city="Springfield"))
+
+        store.address.city = "Shelbyville"
+        store.address.save()
+
+        results = api_client.get(SEARCH_STORES_URL, {"q": "grocery"}).data["results"]
+        assert [result["id"] for result in results] == [store.id]
+        assert len(api_client.get(SEARCH_STORES_URL, {"q": "shelbyville"}).data["results"]) == 1
+        assert len(api_client.get(SEARCH_STORES_URL, {"q": "name"}).data["results"]) == 0
+
+    @pytest.mark.django_db
+    def test_search_without_terms_fails(self, api_client):
+        response = api_client.get(SEARCH_STORES_URL)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_export_ndjson(self, api_client):
+        stores = StoreFactory.create_batch(3)
+        for store in stores:
+            store.opening_hours.add(OpeningHoursFactory.create(weekday=1))
+
+        response = api_client.get(EXPORT_STORES_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        assert [row["id"] for row in rows] == [store.id for store in stores]
+        assert rows[0]["address"]["city"] == stores[0].address.city
+        assert rows[0]["opening_hours"] == [{"weekday": 1, "from_hour": "09:00:00", "to_hour": "20:00:00"}]
+
+    @pytest.mark.django_db
+    def test_export_csv(self, api_client):
+        store = StoreFactory.create()
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1))
+        StoreFactory.create(address=None)
+
+        response = api_client.get(EXPORT_STORES_URL, {"output": "csv"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv"
+        assert response["Content-Disposition"] == 'attachment; filename="stores.csv"'
+        rows = list(csv.DictReader(b"".join(response.streaming_content).decode().splitlines()))
+        assert len(rows) == 2
+        assert rows[0]["id"] == str(store.id)
+        assert rows[0]["country"] == store.address.country
+        assert float(rows[0]["latitude"]) == store.address.latitude
+        assert json.loads(rows[0]["opening_hours"]) == [{"weekday": 1, "from_hour": "09:00:00", "to_hour": "20:00:00"}]
+        assert rows[1]["street"] == ""
+        assert rows[1]["latitude"] == ""
+
+    @pytest.mark.django_db
+    def test_export_applies_filters_across_chunks(self, api_client, monkeypatch):
+        monkeypatch.setattr("django_store_assessment.stores.api.views.StoreViewSet.export_chunk_size", 2)
+        matching = StoreFactory.create_batch(5, name="Exported")
+        for weekday, store in enumerate(matching, start=1):
+            store.opening_hours.add(OpeningHoursFactory.create(weekday=weekday))
+        StoreFactory.create(name="Skipped")
+
+        response = api_client.get(EXPORT_STORES_URL, {"name": "Exported"})
+
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        assert [row["id"] for row in rows] == [store.id for store in matching]
+        assert [row["opening_hours"][0]["weekday"] for row in rows] == [1, 2, 3, 4, 5]
+
+    @pytest.mark.django_db
+    def test_export_with_unknown_format_fails(self, api_client):
+        response = api_client.get(EXPORT_STORES_URL, {"output": "xml"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db(transaction=True)
+    def test_only_writes_run_in_a_transaction(self, api_client, monkeypatch):
+        in_transaction = []
+        get_queryset = StoreViewSet.get_queryset
+
+        def recording_get_queryset(view):
+            in_transaction.append((view.action, connection.in_atomic_block))
+            return get_queryset(view)
+
+        monkeypatch.setattr(StoreViewSet, "get_queryset", recording_get_queryset)
+        store = StoreFactory.create()
+        url = reverse("store-detail", args=[store.id])
+
+        api_client.get(ALL_STORES_URL)
+        api_client.get(url)
+        api_client.get(SEARCH_STORES_URL, {"q": store.name})
+        b"".join(api_client.get(EXPORT_STORES_URL).streaming_content)
+        api_client.patch(url, {"name": "Renamed"}, format="json")
+        api_client.delete(url)
+
+        assert in_transaction == [
+            ("list", False),
+            ("retrieve", False),
+            ("search", False),
+            ("export", False),
+            ("partial_update", True),
+            ("destroy", True),
+        ]
+
+    @pytest.mark.django_db
+    def test_failed_write_is_rolled_back(self, api_client, monkeypatch):
+        def fail(*args, **kwargs):
+            raise RuntimeError("through rows could not be written")
+
+        # Fails after the address and the store rows have been inserted
+        monkeypatch.setattr(Store.opening_hours.through.objects, "bulk_create", fail)
+        api_client.raise_request_exception = False
+        payload = {
+            "name": "Half Written",
+            "address": {
+                "street": "123 Example St",
+                "city": "Example City",
+                "state": "EX",
+                "postal_code": "12345",
+                "country": "Exampleland",
+            },
+            "opening_hours": [{"weekday": 1, "from_hour": "08:00", "to_hour": "17:00"}],
+        }
+
+        response = api_client.post(ALL_STORES_URL, payload, format="json")
+
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert not Store.objects.exists()
+        assert not Address.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStoreViewSetAsgi:
+    # Requests go through Django's ASGI handler; the database is shared with
+    # its worker threads, hence transaction=True
+
+    @pytest.fixture
+    def headers(self, user):
+        # AsyncClient(headers=...) does not reach the request before Django 5.0
+        return {"Authorization": "Token " + Token.objects.create(user=user).key}
+
+    def request(self, method, *args, **kwargs):
+        async def send():
+            return await getattr(AsyncClient(), method)(*args, **kwargs)
+
+        response = async_to_sync(send)()
+        return response.status_code, json.loads(response.content or "null")
+
+    def test_read_views_are_coroutines(self):
+        assert iscoroutinefunction(resolve(ALL_STORES_URL).func)
+        assert iscoroutinefunction(resolve(reverse("store-detail", args=[1])).func)
+
+    def test_list_and_retrieve(self, headers):
+        stores = StoreFactory.create_batch(12)
+        stores[0].opening_hours.add(OpeningHoursFactory.create(weekday=1))
+
+        status_code, data = self.request("get", ALL_STORES_URL, {"page": 2}, headers=headers)
+        assert status_code == status.HTTP_200_OK
+        assert data["count"] == 12
+        assert [store["id"] for store in data["results"]] == [store.id for store in stores[10:]]
+
+        status_code, data = self.request("get", ALL_STORES_URL, headers=headers)
+        assert status_code == status.HTTP_200_OK
+        assert data["results"][0]["opening_hours"] == [{"weekday": 1, "from_hour": "09:00:00", "to_hour": "20:00:00"}]
+        assert data["results"][1]["opening_hours"] == []
+
+        status_code, data = self.request("get", reverse("store-detail", args=[stores[0].id]), headers=headers)
+        assert status_code == status.HTTP_200_OK
+        assert data["name"] == stores[0].name
+        assert len(data["opening_hours"]) == 1
+
+    def test_retrieve_with_open_now(self, headers, monkeypatch):
+        store = StoreFactory.create(timezone="Europe/Berlin")
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1, from_hour="09:00", to_hour="17:00"))
+        now = datetime.datetime(2024, 1, 1, 8, 30, tzinfo=datetime.timezone.utc)
+        monkeypatch.setattr("django.utils.timezone.now", lambda: now)
+        url = reverse("store-detail", args=[store.id])
+
+        status_code, data = self.request("get", url, {"open_now": "true"}, headers=headers)
+        assert status_code == status.HTTP_200_OK
+        assert data["id"] == store.id
+        assert self.request("get", url, {"open_now": "false"}, headers=headers)[0] == status.HTTP_404_NOT_FOUND
+
+    def test_list_with_cursor_pagination(self, headers):
+        stores = StoreFactory.create_batch(3)
+
+        status_code, data = self.request("get", ALL_STORES_URL, {"pagination": "cursor"}, headers=headers)
+
+        assert status_code == status.HTTP_200_OK
+        assert [store["id"] for store in data["results"]] == [store.id for store in stores]
+
+    def test_errors(self, headers):
+        StoreFactory.create()
+
+        assert self.request("get", reverse("store-detail", args=[0]), headers=headers)[0] == 404
+        assert self.request("get", ALL_STORES_URL, {"page": 5}, headers=headers)[0] == 404
+        assert self.request("get", ALL_STORES_URL)[0] == status.HTTP_403_FORBIDDEN
+
+    def test_writes_use_the_regular_view(self, headers):
+        status_code, data = self.request(
+            "post", ALL_STORES_URL, {"name": "Async Store"}, content_type="application/json", headers=headers
+        )
+        assert status_code == status.HTTP_201_CREATED
+
+        url = reverse("store-detail", args=[data["id"]])
+        status_code, data = self.request(
+            "patch", url, {"name": "Renamed"}, content_type="application/json", headers=headers
+        )
+        assert status_code == status.HTTP_200_OK
+        assert self.request("get", url, headers=headers)[1]["name"] == "Renamed"
@@ -0,0 +1,79 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from django_store_assessment.utils.cache import LocalCache
+
+# In front of the shared cache. Other processes cannot invalidate it, so it
+# bounds how long a deleted token or deactivated user may still get through.
+local_token_cache = LocalCache(maxsize=4096, ttl=5)
+
+
+def token_cache_key(key):
+    # Token keys are credentials, keep them out of cache key names
+    return "auth:token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_tokens(keys):
+    cache_keys = [token_cache_key(key) for key in keys]
+    if not cache_keys:
+        return
+
+    def invalidate():
+        cache.delete_many(cache_keys)
+        for cache_key in cache_keys:
+            local_token_cache.discard(cache_key)
+
+    # Again after commit, a concurrent request may have cached the old rows meanwhile
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def dump_credentials(user, token):
+    # Every field but the password hash, which has no business in the shared cache
+    fields = [field.attname for field in user._meta.concrete_fields if field.attname != "password"]
+    return {
+        "db": user._state.db,
+        "user": {name: getattr(user, name) for name in fields},
+        "token": {"key": token.key, "created": token.created},
+    }
+
+
+def load_credentials(credentials):
+    # The password is deferred, it is read from the database if ever needed
+    values = credentials["user"]
+    user = get_user_model().from_db(credentials["db"], list(values), list(values.values()))
+    token = Token(user=user, **credentials["token"])
+    token._state.adding = False
+    token._state.db = credentials["db"]
+    return user, token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps the token's user in the cache.
+
+    The Token/User join runs once per ``cache_timeout`` instead of on every
+    request. Deleting a token or saving its user invalidates the entry, see
+    users/signals.py. Failed lookups are not cached, and neither are
+    password hashes.
+    """
+
+    cache_timeout = 60
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        credentials = local_token_cache.get(cache_key)
+        if credentials is None:
+            credentials = cache.get(cache_key)
+            if credentials is None:
+                credentials = dump_credentials(*super().authenticate_credentials(key))
+                cache.set(cache_key, credentials, self.cache_timeout)
+            local_token_cache.update({cache_key: credentials})
+
+        # Every request gets its own instances, the cached values are shared
+        return load_credentials(credentials)
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from django_store_assessment.users.authentication import invalidate_tokens
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=get_user_model())
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Deactivation, but also any other change, must not be served from the
+    # cache. Logging in only touches last_login and happens often.
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    invalidate_tokens(Token.objects.filter(user=instance).values_list("key", flat=True))
@@ -0,0 +1,81 @@
+import pickle
+
+import pytest
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from django_store_assessment.users.authentication import CachedTokenAuthentication, local_token_cache, token_cache_key
+
+
+@pytest.fixture(autouse=True)
+def clear_local_token_cache():
+    local_token_cache.clear()
+    yield
+    local_token_cache.clear()
+
+
+@pytest.fixture
+def token(user):
+    return Token.objects.create(user=user)
+
+
+def authenticate(token):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {token.key}")
+    return CachedTokenAuthentication().authenticate(request)
+
+
+@pytest.mark.django_db
+class TestCachedTokenAuthentication:
+    def test_lookup_is_cached(self, token, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            user, _ = authenticate(token)
+        with django_assert_num_queries(0):
+            cached_user, cached_token = authenticate(token)
+
+        assert cached_user == user == token.user
+        assert cached_token.user is cached_user
+        # Each request gets its own copy
+        assert cached_user is not user
+
+    def test_password_hash_is_not_cached(self, token, user, django_assert_num_queries):
+        authenticate(token)
+
+        assert user.password not in pickle.dumps(cache.get(token_cache_key(token.key))).decode(errors="ignore")
+        cached_user, _ = authenticate(token)
+        # Read from the database when needed
+        with django_assert_num_queries(1):
+            assert cached_user.password == user.password
+
+    def test_shared_cache_survives_local_expiry(self, token, django_assert_num_queries):
+        authenticate(token)
+        local_token_cache.clear()
+
+        with django_assert_num_queries(0):
+            authenticate(token)
+
+    def test_deleted_token_is_rejected(self, token):
+        authenticate(token)
+
+        token.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token)
+
+    def test_deactivated_user_is_rejected(self, token, user):
+        authenticate(token)
+
+        user.is_active = False
+        user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token)
+
+    def test_login_keeps_the_cache(self, token, user, django_assert_num_queries):
+        authenticate(token)
+
+        user.save(update_fields=["last_login"])
+
+        with django_assert_num_queries(0):
+            authenticate(token)
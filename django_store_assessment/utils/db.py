@@ -0,0 +1,69 @@
+"""
+Primary/replica routing.
+
+Replicas (``DATABASE_REPLICA_URLS``) only serve reads that opted in with
+``read_from_replicas()``, e.g. the read-only actions of a viewset, and are
+picked round-robin. Everything else, and every read in a context that has
+written anything, uses the primary. ``DATABASE_REPLICA_READS`` turns the
+replicas off altogether.
+"""
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS_PREFIX = "replica"
+
+# Replica alias for reads in the current context, None means the primary
+_read_alias = ContextVar("read_alias", default=None)
+_round_robin = itertools.count()
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_ALIAS_PREFIX)]
+
+
+def next_replica():
+    aliases = replica_aliases()
+    if not aliases or not settings.DATABASE_REPLICA_READS:
+        return None
+    return aliases[next(_round_robin) % len(aliases)]
+
+
+def reading_from_replica():
+    """Whether reads in the current context go to a replica."""
+    return _read_alias.get() is not None
+
+
+@contextmanager
+def read_from_replicas():
+    """Send the reads in the block to one replica, if there are any."""
+    # Restore the previous alias rather than reset() a token: async views
+    # enter the block in a worker thread's copy of the context and leave it
+    # in their own
+    previous = _read_alias.get()
+    _read_alias.set(next_replica())
+    try:
+        yield
+    finally:
+        _read_alias.set(previous)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Whatever is read next in this context must see the write
+        _read_alias.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema from the primary
+        return not db.startswith(REPLICA_ALIAS_PREFIX)
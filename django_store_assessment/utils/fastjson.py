@@ -0,0 +1,87 @@
+"""
+DRF JSON renderer and parser backed by orjson, when it is installed.
+
+Responses are byte for byte the ones DRF's ``JSONRenderer`` produces with
+the default settings: compact, UTF-8, U+2028/U+2029 escaped. orjson writes
+str, int, float, dict, list (and their subclasses, e.g. serializer output),
+datetimes and UUIDs natively; everything else, e.g. Decimal or lazy
+translations, goes through DRF's ``JSONEncoder.default()``. Anything orjson
+cannot express (pretty printing, non-str keys, integers beyond 64 bits) or
+writes differently (floats with an exponent, NaN and infinities, which
+JSONRenderer rejects) falls back to the stdlib ``json`` based
+implementation, as does everything when orjson is missing.
+"""
+import math
+import re
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+LINE_SEPARATORS = (("\u2028".encode(), b"\\u2028"), ("\u2029".encode(), b"\\u2029"))
+
+# orjson writes "1e16" and "1e-7" where json writes "1e+16" and "1e-07". A
+# string looking like such a number only costs a fallback.
+EXPONENT_RE = re.compile(rb"[:,\[]-?\d+(?:\.\d+)?e")
+
+
+def has_non_finite_floats(data):
+    """Whether ``data`` holds NaN or an infinity, which orjson writes as null."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_UTC_Z)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if EXPONENT_RE.search(ret) or (b"null" in ret and has_non_finite_floats(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as JSONRenderer, keep the output a strict javascript subset
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        # orjson only reads UTF-8 and always rejects NaN and Infinity
+        if orjson is None or encoding.lower() not in ("utf-8", "utf8") or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,20 @@
+from django_store_assessment.utils.cache import LocalCache
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(maxsize=2)
+    cache.update({"a": 1, "b": 2})
+    assert cache.get("a") == 1
+
+    cache.update({"c": 3})
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_local_cache_expires_entries():
+    cache = LocalCache(ttl=-1)
+    cache.update({"a": 1})
+
+    assert cache.get("a") is None
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from django_store_assessment.stores.models import Store
+from django_store_assessment.stores.tests.factories import OpeningHoursFactory, StoreFactory
+from django_store_assessment.users.tests.factories import UserFactory
+from django_store_assessment.utils.db import PrimaryReplicaRouter, next_replica, read_from_replicas
+
+ALL_STORES_URL = reverse("store-list")
+
+
+@pytest.fixture
+def replica_reads(settings):
+    settings.DATABASE_REPLICA_READS = True
+    return settings
+
+
+def test_replicas_are_used_round_robin(replica_reads):
+    replica_reads.DATABASES = {
+        DEFAULT_DB_ALIAS: {},
+        "replica1": {},
+        "replica2": {},
+    }
+
+    assert {next_replica(), next_replica()} == {"replica1", "replica2"}
+
+
+def test_replica_reads_can_be_turned_off(settings):
+    settings.DATABASE_REPLICA_READS = False
+
+    with read_from_replicas():
+        assert PrimaryReplicaRouter().db_for_read(Store) is None
+
+
+def test_writes_pin_the_rest_of_the_block_to_the_primary(replica_reads):
+    router = PrimaryReplicaRouter()
+    assert router.db_for_read(Store) is None
+
+    with read_from_replicas():
+        assert router.db_for_read(Store) == "replica1"
+        assert router.db_for_write(Store) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(Store) is None
+
+
+@pytest.mark.django_db(transaction=True, databases=[DEFAULT_DB_ALIAS, "replica1"])
+class TestStoreViewSetReplicaReads:
+    @pytest.fixture
+    def client(self, user, replica_reads):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=user).key)
+        return client
+
+    def queries_by_alias(self, request):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary:
+            with CaptureQueriesContext(connections["replica1"]) as replica:
+                response = request()
+        return response, len(primary), len(replica)
+
+    def test_reads_go_to_the_replica(self, client):
+        StoreFactory.create()
+
+        response, _, replica = self.queries_by_alias(lambda: client.get(ALL_STORES_URL))
+
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 1
+        assert replica > 0
+
+    def test_reads_after_a_write_stay_on_the_primary(self, client, settings):
+        store = StoreFactory.create()
+        url = reverse("store-detail", args=[store.id])
+
+        response, _, replica = self.queries_by_alias(lambda: client.patch(url, {"name": "Renamed"}, format="json"))
+        assert response.status_code == 200
+        assert replica == 0
+
+        response, primary, replica = self.queries_by_alias(lambda: client.get(url))
+        assert response.data["name"] == "Renamed"
+        assert primary > 0
+        assert replica == 0
+
+    def test_stale_replica_reads_are_not_served_to_the_writer(self, client, replica_reads):
+        store = StoreFactory.create(name="Before")
+        url = reverse("store-detail", args=[store.id])
+        other_client = APIClient()
+        other_client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=UserFactory()).key)
+
+        # A replica lagging behind: its snapshot predates the write
+        with transaction.atomic(using="replica1"):
+            connections["replica1"].cursor().execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            Store.objects.using("replica1").count()
+
+            assert client.patch(url, {"name": "After"}, format="json").status_code == 200
+            assert other_client.get(url).data["name"] == "Before"
+            assert client.get(url).data["name"] == "After"
+
+    def test_streamed_export_reads_from_the_replica(self, client):
+        StoreFactory.create_batch(3)
+
+        def export():
+            response = client.get(reverse("store-export"))
+            response.rows = b"".join(response.streaming_content).splitlines()
+            return response
+
+        response, _, replica = self.queries_by_alias(export)
+
+        assert len(response.rows) == 3
+        assert replica > 0
+
+    def test_streamed_export_reads_opening_hours_from_the_replica(self, client):
+        store = StoreFactory.create()
+        store.opening_hours.add(OpeningHoursFactory.create(weekday=1, from_hour="09:00", to_hour="17:00"))
+        through_table = Store.opening_hours.through._meta.db_table
+
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary:
+            with CaptureQueriesContext(connections["replica1"]) as replica:
+                response = client.get(reverse("store-export"))
+                rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        assert rows[0]["opening_hours"] == [{"weekday": 1, "from_hour": "09:00:00", "to_hour": "17:00:00"}]
+        assert any(through_table in query["sql"] for query in replica.captured_queries)
+        assert not any(through_table in query["sql"] for query in primary.captured_queries)
@@ -0,0 +1,93 @@
+import datetime
+import decimal
+import io
+import uuid
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from django_store_assessment.utils import fastjson
+from django_store_assessment.utils.fastjson import FastJSONParser, FastJSONRenderer
+
+DATA = {
+    "id": 1,
+    "name": 'Café \u2028 Ünïcode \u2029 "quoted" \\ </script>',
+    "ratio": 0.1,
+    "price": decimal.Decimal("12.50"),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "from_hour": datetime.time(8, 30),
+    "to_hour": datetime.time(17, 0, 0, 250000),
+    "day": datetime.date(2024, 2, 29),
+    "naive": datetime.datetime(2024, 1, 1, 12, 0),
+    "utc": datetime.datetime(2024, 1, 1, 12, 0, tzinfo=datetime.timezone.utc),
+    "london": datetime.datetime(2024, 1, 1, 12, 0, tzinfo=ZoneInfo("Europe/London")),
+    "berlin": datetime.datetime(2024, 1, 1, 12, 0, 0, 5, tzinfo=ZoneInfo("Europe/Berlin")),
+    "label": gettext_lazy("Name"),
+    "nested": [{"weekday": 1, "empty": None, "flags": [True, False]}, (), {}],
+}
+
+
+class TestFastJSONRenderer:
+    @pytest.mark.parametrize(
+        "data",
+        [
+            DATA,
+            [DATA, DATA],
+            {"big": 2**64},
+            {1: "non-str key"},
+            "text",
+            0,
+            None,
+            {"floats": [1e16, -1.5e300, 1e-7, 0.1, 1e15]},
+            {"text": "1e5", "list": ["a,1e5"]},
+        ],
+    )
+    def test_output_matches_json_renderer(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.parametrize("value", [float("nan"), float("inf"), -float("inf")])
+    def test_non_finite_floats_fail_like_json_renderer(self, value):
+        data = {"latitude": None, "nested": [{"longitude": value}]}
+        with pytest.raises(ValueError):
+            JSONRenderer().render(data)
+        with pytest.raises(ValueError):
+            FastJSONRenderer().render(data)
+
+    def test_indent_falls_back_to_json_renderer(self):
+        rendered = FastJSONRenderer().render(DATA, "application/json; indent=2")
+
+        assert rendered == JSONRenderer().render(DATA, "application/json; indent=2")
+        assert b'\n  "id": 1' in rendered
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(fastjson, "orjson", None)
+
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+    def test_unsupported_types_fail_like_json_renderer(self):
+        with pytest.raises(TypeError):
+            FastJSONRenderer().render({"value": object()})
+
+
+class TestFastJSONParser:
+    def parse(self, parser, content, encoding="utf-8"):
+        return parser.parse(io.BytesIO(content), "application/json", {"encoding": encoding})
+
+    @pytest.mark.parametrize(
+        "content",
+        [b'{"name": "Caf\xc3\xa9", "hours": [{"weekday": 1}], "ratio": 1.5e3}', b"[]", b'"\\u2028"'],
+    )
+    def test_result_matches_json_parser(self, content):
+        assert self.parse(FastJSONParser(), content) == self.parse(JSONParser(), content)
+
+    @pytest.mark.parametrize("content", [b"{", b'{"value": NaN}', b"\xff"])
+    def test_invalid_json(self, content):
+        with pytest.raises(ParseError, match="JSON parse error"):
+            self.parse(FastJSONParser(), content)
+
+    def test_other_encodings_fall_back_to_json_parser(self):
+        assert self.parse(FastJSONParser(), '{"name": "Café"}'.encode("latin-1"), "latin-1") == {"name": "Café"}
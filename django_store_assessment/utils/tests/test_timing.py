@@ -0,0 +1,112 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from config.settings.base import budget
+from django_store_assessment.stores.tests.factories import StoreFactory
+from django_store_assessment.utils.timing import span
+
+ALL_STORES_URL = reverse("store-list")
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def timing(settings):
+    settings.REQUEST_TIMING = True
+    settings.REQUEST_TIMING_QUERY_BUDGET = 20
+    settings.REQUEST_TIMING_LATENCY_BUDGET_MS = 10_000
+    return settings
+
+
+@pytest.mark.django_db
+class TestServerTimingMiddleware:
+    def test_disabled_by_default(self, client):
+        response = client.get(ALL_STORES_URL)
+
+        assert "Server-Timing" not in response
+
+    def test_server_timing_header(self, client, timing, django_assert_num_queries):
+        StoreFactory.create()
+
+        # count, page of stores and the opening hours prefetch
+        with django_assert_num_queries(3):
+            response = client.get(ALL_STORES_URL)
+
+        metrics = dict(entry.split(";", 1) for entry in response["Server-Timing"].split(", "))
+        assert metrics.keys() == {"db", "serialize", "render", "total"}
+        assert 'desc="3 queries"' in metrics["db"]
+
+    def test_log_line(self, client, timing, caplog):
+        with caplog.at_level(logging.INFO, logger="django_store_assessment.utils.timing"):
+            client.get(ALL_STORES_URL)
+
+        (record,) = caplog.records
+        assert record.levelno == logging.INFO
+        assert record.timing["path"] == ALL_STORES_URL
+        assert record.timing["status"] == 200
+        assert record.timing["over_budget"] == []
+        assert "queries=" in record.getMessage()
+
+    def test_over_budget_requests_are_flagged(self, client, timing, caplog):
+        timing.REQUEST_TIMING_QUERY_BUDGET = 0
+        timing.REQUEST_TIMING_LATENCY_BUDGET_MS = 0
+
+        with caplog.at_level(logging.INFO, logger="django_store_assessment.utils.timing"):
+            client.get(ALL_STORES_URL)
+
+        (record,) = caplog.records
+        assert record.levelno == logging.WARNING
+        assert record.timing["over_budget"] == ["queries", "latency"]
+
+    def test_budgets_can_be_turned_off(self, client, timing, caplog):
+        timing.REQUEST_TIMING_QUERY_BUDGET = None
+        timing.REQUEST_TIMING_LATENCY_BUDGET_MS = None
+
+        with caplog.at_level(logging.INFO, logger="django_store_assessment.utils.timing"):
+            client.get(ALL_STORES_URL)
+
+        (record,) = caplog.records
+        assert record.levelno == logging.INFO
+        assert record.timing["over_budget"] == []
+
+
+def test_budget_settings(monkeypatch):
+    monkeypatch.setenv("DJANGO_REQUEST_TIMING_QUERY_BUDGET", "")
+    monkeypatch.setenv("DJANGO_REQUEST_TIMING_LATENCY_BUDGET_MS", "250")
+
+    assert budget("DJANGO_REQUEST_TIMING_QUERY_BUDGET", 20) is None
+    assert budget("DJANGO_REQUEST_TIMING_LATENCY_BUDGET_MS", 500) == 250
+    assert budget("DJANGO_REQUEST_TIMING_UNSET_BUDGET", 500) == 500
+
+
+def test_span_outside_a_timed_request_is_a_no_op():
+    with span("serialize"):
+        pass
+
+
+@pytest.mark.django_db(transaction=True)
+def test_server_timing_header_under_asgi(user, timing):
+    StoreFactory.create()
+    token = Token.objects.create(user=user)
+
+    async def get():
+        return await AsyncClient().get(ALL_STORES_URL, headers={"Authorization": f"Token {token.key}"})
+
+    response = async_to_sync(get)()
+
+    assert response.status_code == 200
+    metrics = dict(entry.split(";", 1) for entry in response["Server-Timing"].split(", "))
+    # The token lookup, then the same queries as above
+    assert 'desc="4 queries"' in metrics["db"]
+    assert metrics.keys() == {"db", "serialize", "render", "total"}
@@ -0,0 +1,147 @@
+"""
+Per-request timing, reported as ``Server-Timing`` headers and a log line.
+
+``ServerTimingMiddleware`` measures the whole request, its SQL queries and
+the rendering of template/DRF responses. Other phases are recorded by
+wrapping them in ``span()``, e.g. serializer output in the stores API.
+Spans may overlap: queries run while serializing count towards both.
+
+The middleware is enabled with the ``REQUEST_TIMING`` setting. When it is
+off Django drops it from the middleware chain and ``span()`` costs a
+context variable lookup.
+"""
+import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Seconds per metric name, set while a request is timed
+_timings: ContextVar[defaultdict[str, float] | None] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the ``name`` metric of the current request, if it is timed."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] += time.perf_counter() - start
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.query_budget = settings.REQUEST_TIMING_QUERY_BUDGET
+        self.latency_budget_ms = settings.REQUEST_TIMING_LATENCY_BUDGET_MS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings: defaultdict[str, float] = defaultdict(float)
+        queries: list[str] = []
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.record_queries(stack, timings, queries)
+                response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, timings, queries, start)
+
+    async def __acall__(self, request):
+        timings: defaultdict[str, float] = defaultdict(float)
+        queries: list[str] = []
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                # Under ASGI the queries run in the request's worker thread,
+                # on that thread's connections
+                await sync_to_async(self.record_queries)(stack, timings, queries)
+                response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, timings, queries, start)
+
+    def report(self, request, response, timings, queries, start):
+        total_ms = (time.perf_counter() - start) * 1000
+
+        metrics = {name: seconds * 1000 for name, seconds in timings.items()}
+        response["Server-Timing"] = ", ".join(
+            [f'db;dur={metrics.get("db", 0):.1f};desc="{len(queries)} queries"']
+            + [f"{name};dur={value:.1f}" for name, value in metrics.items() if name != "db"]
+            + [f"total;dur={total_ms:.1f}"]
+        )
+
+        over_budget = []
+        if self.query_budget is not None and len(queries) > self.query_budget:
+            over_budget.append("queries")
+        if self.latency_budget_ms is not None and total_ms > self.latency_budget_ms:
+            over_budget.append("latency")
+        timing = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": len(queries),
+            "total_ms": round(total_ms, 1),
+            **{f"{name}_ms": round(value, 1) for name, value in metrics.items()},
+            "over_budget": over_budget,
+        }
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            " ".join(
+                f"{key}={','.join(value) if isinstance(value, list) else value}" for key, value in timing.items()
+            ),
+            extra={"timing": timing},
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # Called just before a deferred (DRF or template) response is rendered
+        timings = _timings.get()
+        if timings is None:
+            return response
+        start = time.perf_counter()
+
+        def rendered(response):
+            timings["render"] += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def record_queries(self, stack, timings, queries):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self.record_query(timings, queries)))
+
+    @staticmethod
+    def record_query(timings, queries):
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timings["db"] += time.perf_counter() - start
+                queries.append(sql)
+
+        return wrapper